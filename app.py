@@ -1,19 +1,33 @@
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request
 import joblib
-import numpy as np
 from sentiment_analyzer import SentimentAnalyzer
-import logging
-from datetime import datetime
+from error_handling import ValidationError
+from utils import now_iso, ojsonify
+from inference import fuse_scaler, input_buffer
+
+# Use Intel-optimized scikit-learn kernels when available; must run before
+# the estimators are unpickled so they resolve to the patched classes
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
 
 app = Flask(__name__)
 
 # Load the model and preprocessing objects
 model = joblib.load('mental_health_model_final.pkl')
-scaler = joblib.load('scaler_final.pkl')
+scaler = fuse_scaler(joblib.load('scaler_final.pkl'))
 le_gender = joblib.load('le_gender_final.pkl')
 le_target = joblib.load('le_target_final.pkl')
 
+# Class labels in probability-column order, cached once for building responses
+_TARGET_CLASSES = tuple(str(c) for c in le_target.classes_)
+
+# Gender label -> encoded value, avoids LabelEncoder.transform on a single scalar
+_GENDER_MAP = {cls: i for i, cls in enumerate(le_gender.classes_)}
+
 # Initialize sentiment analyzer
 sentiment_analyzer = SentimentAnalyzer()
 
@@ -29,16 +43,19 @@ def predict():
     try:
         data = request.get_json()
 
+        gender = data['Gender']
+        if gender not in _GENDER_MAP:
+            raise ValidationError('Gender', gender, f"must be one of {', '.join(_GENDER_MAP)}")
+
         # Prepare input data
-        input_data = np.array([
-            data['Sentiment_Score'],
-            data['HRV'],
-            data['Sleep_Hours'],
-            data['Activity'],
-            data['Age'],
-            le_gender.transform([data['Gender']])[0],
-            data['Work_Study_Hours']
-        ]).reshape(1, -1)
+        input_data = input_buffer(len(feature_columns))
+        input_data[0, 0] = data['Sentiment_Score']
+        input_data[0, 1] = data['HRV']
+        input_data[0, 2] = data['Sleep_Hours']
+        input_data[0, 3] = data['Activity']
+        input_data[0, 4] = data['Age']
+        input_data[0, 5] = _GENDER_MAP[gender]
+        input_data[0, 6] = data['Work_Study_Hours']
 
         # Scale the input
         input_scaled = scaler.transform(input_data)
@@ -48,22 +65,19 @@ def predict():
         probabilities = model.predict_proba(input_scaled)[0]
 
         # Convert prediction back to original label
-        prediction_label = le_target.inverse_transform([prediction])[0]
+        prediction_label = _TARGET_CLASSES[prediction]
 
         # Create response
         response = {
             'prediction': prediction_label,
-            'probabilities': {
-                le_target.classes_[i]: float(prob) 
-                for i, prob in enumerate(probabilities)
-            },
-            'timestamp': datetime.now().isoformat()
+            'probabilities': dict(zip(_TARGET_CLASSES, probabilities.tolist())),
+            'timestamp': now_iso()
         }
 
-        return jsonify(response)
+        return ojsonify(response)
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
+        return ojsonify({'error': str(e)}), 400
 
 @app.route('/calculate_sentiment', methods=['POST'])
 def calculate_sentiment():
@@ -83,13 +97,13 @@ def calculate_sentiment():
                 survey_responses=data.get('survey')
             )
 
-        return jsonify({
+        return ojsonify({
             'sentiment_score': round(score, 3),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         })
 
     except Exception as e:
-        return jsonify({'error': str(e)}), 400
+        return ojsonify({'error': str(e)}), 400
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
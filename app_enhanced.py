@@ -1,20 +1,27 @@
-from flask import Flask, request, jsonify, send_from_directory, session, g
-import pandas as pd
-import numpy as np
+from flask import Flask, request, send_from_directory, session, g
 import joblib
+import orjson
 import os
 import time
 import uuid
-from datetime import datetime
-import logging
 
 # Import our new modules (simplified version without database)
 from config import Config
 from logging_config import setup_logging, log_prediction, log_performance, log_request_info, log_response_info
-from error_handling import validate_input_data, handle_error, create_success_response, check_crisis_conditions
-from medical_guidance import create_professional_guidance_response, MedicalGuidance
+from error_handling import validate_input_data, handle_error, create_success_response, check_crisis_conditions, ValidationError
+from medical_guidance import create_professional_guidance_response
 from security_privacy import require_security_check, validate_input_security, add_security_headers, PrivacyManager
 from sentiment_analyzer import SentimentAnalyzer
+from inference import PredictionBatcher, ScoringPool, fuse_scaler, input_buffer, load_native_predictor, load_pruned_ensemble
+from utils import BackgroundFileWriter, json_response, now_iso, ojsonify
+
+# Use Intel-optimized scikit-learn kernels when available; must run before
+# the estimators are unpickled so they resolve to the patched classes
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn()
+except ImportError:
+    pass
 
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -39,14 +46,39 @@ model = None
 scaler = None
 le_gender = None
 le_target = None
+native_predictor = None
+pruned_model = None
+scoring_pool = None
+
+# Gender label -> encoded value, filled from le_gender.classes_ once the encoder is loaded
+_GENDER_MAP = {}
+
+_backend_path = {
+    'onnx': Config.ONNX_MODEL_PATH,
+    'treelite': Config.TREELITE_MODEL_PATH
+}.get(Config.INFERENCE_BACKEND)
 
 _load_on_startup = os.getenv("LOAD_MODELS_ON_STARTUP", "1") == "1"
 if _load_on_startup:
     try:
-        model = joblib.load(Config.MODEL_PATH)
-        scaler = joblib.load(Config.SCALER_PATH)
+        model = joblib.load(Config.MODEL_PATH, mmap_mode=Config.MODEL_MMAP_MODE)
+        if Config.MODEL_N_JOBS is not None and 'n_jobs' in model.get_params():
+            model.set_params(n_jobs=Config.MODEL_N_JOBS)
+        scaler = fuse_scaler(joblib.load(Config.SCALER_PATH))
         le_gender = joblib.load(Config.LE_GENDER_PATH)
         le_target = joblib.load(Config.LE_TARGET_PATH)
+        _GENDER_MAP.update({cls: i for i, cls in enumerate(le_gender.classes_)})
+        native_predictor = load_native_predictor(Config.INFERENCE_BACKEND, _backend_path)
+        pruned_model = load_pruned_ensemble(model, Config.PRUNED_ENSEMBLE_PATH)
+        if Config.SCORING_PROCESSES > 0:
+            scoring_pool = ScoringPool(
+                Config.SCORING_PROCESSES,
+                Config.MODEL_PATH,
+                mmap_mode=Config.MODEL_MMAP_MODE,
+                backend=Config.INFERENCE_BACKEND,
+                backend_path=_backend_path,
+                timeout=Config.SCORING_TIMEOUT_S
+            )
         app.logger.info("Model and preprocessing objects loaded successfully")
     except Exception as e:
         app.logger.error(f"Failed to load model: {str(e)}")
@@ -58,13 +90,44 @@ else:
 sentiment_analyzer = SentimentAnalyzer()
 app.logger.info("Sentiment analyzer initialized successfully")
 
-# Print feature importance when model is available
+# Print feature importance when requested; computing it walks every tree, so
+# it's opt-in to keep worker start-up fast. The values are kept for reuse.
 columns = Config.FEATURE_COLUMNS
-if model is not None and hasattr(model, 'feature_importances_'):
+feature_importances = None
+if os.getenv('PRINT_FEATURE_IMPORTANCE', '0') == '1' and model is not None and hasattr(model, 'feature_importances_'):
+    feature_importances = dict(zip(columns, model.feature_importances_.tolist()))
     app.logger.info("Feature Importance:")
-    for feature, importance in zip(columns, model.feature_importances_):
+    for feature, importance in feature_importances.items():
         app.logger.info(f"{feature}: {importance:.4f}")
 
+# Response constants, built once instead of per request
+_LABELS = tuple(Config.HEALTH_STATUS_MAPPING[i] for i in range(len(Config.HEALTH_STATUS_MAPPING)))
+_CHATBOT = {
+    "Low": "It looks like you might be experiencing low mental health. Consider reaching out to a friend or professional for support.",
+    "Moderate": "Your mental health seems moderate. Keep up with self-care practices, and consider talking to someone if you feel overwhelmed.",
+    "High": "Great news! Your mental health appears to be high. Keep maintaining your healthy habits!"
+}
+_UNCERTAIN_DISCLAIMER = "This prediction is uncertain (confidence below 70%). Please consult a professional for an accurate assessment."
+
+def _score_batch(rows):
+    """Scale raw feature rows and return class probabilities for each"""
+    scaled = scaler.transform(rows)
+    if scoring_pool is not None:
+        return scoring_pool.predict_proba(scaled)
+    if native_predictor is not None:
+        return native_predictor.predict_proba(scaled)
+    if pruned_model is not None:
+        return pruned_model.predict_proba(scaled)
+    return model.predict_proba(scaled)
+
+# Concurrent predictions share one scaler/model call per batch
+prediction_batcher = PredictionBatcher(
+    _score_batch,
+    max_batch_size=Config.BATCH_MAX_SIZE,
+    max_wait_ms=Config.BATCH_MAX_WAIT_MS,
+    timeout_s=Config.SCORING_TIMEOUT_S
+)
+
 # Serve the HTML file
 @app.route('/')
 def serve_html():
@@ -86,24 +149,26 @@ def predict():
         session_id = session.get('session_id', str(uuid.uuid4()))
         session['session_id'] = session_id
         
-        # Convert to DataFrame
-        new_data = pd.DataFrame([data], columns=Config.FEATURE_COLUMNS)
-        
-        # Preprocess the data
-        new_data['Gender'] = le_gender.transform(new_data['Gender'])
-        new_data_scaled = scaler.transform(new_data)
+        # Fill the input row in feature order, encoding Gender via the lookup table
+        new_data = input_buffer(len(Config.FEATURE_COLUMNS))
+        for i, column in enumerate(Config.FEATURE_COLUMNS):
+            value = data[column]
+            if column == 'Gender':
+                if value not in _GENDER_MAP:
+                    raise ValidationError('Gender', value, f"must be one of {', '.join(_GENDER_MAP)}")
+                value = _GENDER_MAP[value]
+            new_data[0, i] = float(value)
         
-        # Predict
-        start_time = time.time()
-        prediction = model.predict(new_data_scaled)[0]
-        probs = model.predict_proba(new_data_scaled)[0]
-        processing_time = time.time() - start_time
+        # Preprocess and predict (batched with any concurrent requests)
+        start_time = time.perf_counter()
+        probs = prediction_batcher.predict(new_data[0])
+        prediction = int(probs.argmax())
+        processing_time = time.perf_counter() - start_time
         
-        health_status = Config.HEALTH_STATUS_MAPPING
-        result = health_status[prediction]
+        result = _LABELS[prediction]
         
         # Include probabilities in the response
-        prob_dict = {health_status[i]: float(prob) for i, prob in enumerate(probs)}
+        prob_dict = dict(zip(_LABELS, probs.tolist()))
         
         # Check for crisis conditions
         crisis_detected = False
@@ -117,24 +182,17 @@ def predict():
         
         # Add a disclaimer for borderline predictions
         max_prob = probs.max()
-        disclaimer = ""
-        if max_prob < 0.7:
-            disclaimer = "This prediction is uncertain (confidence below 70%). Please consult a professional for an accurate assessment."
+        disclaimer = _UNCERTAIN_DISCLAIMER if max_prob < 0.7 else ""
         
         # Add a simple chatbot-like message
-        if result == "Low":
-            chatbot_message = "It looks like you might be experiencing low mental health. Consider reaching out to a friend or professional for support."
-        elif result == "Moderate":
-            chatbot_message = "Your mental health seems moderate. Keep up with self-care practices, and consider talking to someone if you feel overwhelmed."
-        else:  # High
-            chatbot_message = "Great news! Your mental health appears to be high. Keep maintaining your healthy habits!"
+        chatbot_message = _CHATBOT[result]
         
         # Create professional guidance
         professional_guidance = create_professional_guidance_response(result, max_prob)
         
         # Log prediction for analytics
         log_prediction(
-            session_id, data, result, prob_dict, processing_time, request.remote_addr
+            session_id, data, result, prob_dict, processing_time, request.remote_addr, g.user_agent
         )
         
         return create_success_response(
@@ -145,6 +203,9 @@ def predict():
         app.logger.error(f"Prediction error: {str(e)}")
         return handle_error(e)
 
+# Feedback lines are appended by a background thread so requests don't wait on disk
+feedback_writer = BackgroundFileWriter('feedback.log')
+
 @app.route('/feedback', methods=['POST'])
 @require_security_check
 @validate_input_security
@@ -153,32 +214,33 @@ def feedback():
         feedback_data = getattr(request, 'sanitized_data', request.get_json())
         
         # Simple file-based feedback logging
-        with open('feedback.log', 'a') as f:
-            f.write(f"{datetime.utcnow().isoformat()}: {feedback_data}\n")
+        feedback_writer.write(f"{now_iso()}: {feedback_data}\n")
         
         app.logger.info(f"Feedback received: {feedback_data}")
         
-        return jsonify({
+        return ojsonify({
             'message': 'Feedback received successfully',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         })
         
     except Exception as e:
         app.logger.error(f"Feedback error: {str(e)}")
         return handle_error(e)
 
+# The privacy notice is static, so serialize it once rather than per request
+_PRIVACY_NOTICE_JSON = orjson.dumps(PrivacyManager.create_privacy_notice())
+
 @app.route('/privacy', methods=['GET'])
 def privacy_notice():
     """Return privacy notice"""
-    privacy_manager = PrivacyManager()
-    return jsonify(privacy_manager.create_privacy_notice())
+    return json_response(_PRIVACY_NOTICE_JSON)
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint for monitoring"""
-    return jsonify({
+    return ojsonify({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': now_iso(),
         'version': '2.0.0'
     })
 
@@ -192,7 +254,7 @@ def calculate_sentiment():
         data = getattr(request, 'sanitized_data', request.get_json())
         
         if not data:
-            return jsonify({'error': 'No data provided'}), 400
+            return ojsonify({'error': 'No data provided'}), 400
         
         sentiment_score = None
         method_used = None
@@ -223,7 +285,7 @@ def calculate_sentiment():
             method_used = 'combined_analysis'
         
         if sentiment_score is None:
-            return jsonify({'error': 'Unable to calculate sentiment score'}), 400
+            return ojsonify({'error': 'Unable to calculate sentiment score'}), 400
         
         # Interpret the sentiment score
         interpretation = get_sentiment_interpretation(sentiment_score)
@@ -232,13 +294,13 @@ def calculate_sentiment():
             'sentiment_score': round(sentiment_score, 3),
             'method_used': method_used,
             'interpretation': interpretation,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': now_iso(),
             'status': 'success'
         }
         
         app.logger.info(f"Sentiment calculated: {sentiment_score:.3f} using {method_used}")
         
-        return jsonify(response_data)
+        return ojsonify(response_data)
         
     except Exception as e:
         app.logger.error(f"Sentiment calculation error: {str(e)}")
@@ -1,5 +1,4 @@
 import os
-from datetime import datetime
 
 class Config:
     """Configuration class for the mental health prediction app"""
@@ -16,12 +15,34 @@ class Config:
     
     # Rate limiting
     RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', '60'))
+    # Redis shared by all workers for rate limits and failed attempts ('' keeps them per process)
+    REDIS_URL = os.environ.get('REDIS_URL', '')
     
     # Model configuration
     MODEL_PATH = 'mental_health_model_final.pkl'
     SCALER_PATH = 'scaler_final.pkl'
     LE_GENDER_PATH = 'le_gender_final.pkl'
     LE_TARGET_PATH = 'le_target_final.pkl'
+    # Memory-map the model's numpy arrays so forked workers share them ('' disables)
+    MODEL_MMAP_MODE = os.environ.get('MODEL_MMAP_MODE', 'r') or None
+    # Threads the model may use per predict call ('' keeps the value it was trained with)
+    MODEL_N_JOBS = int(os.environ['MODEL_N_JOBS']) if os.environ.get('MODEL_N_JOBS') else None
+    # Optional ONNX export of MODEL_PATH (see export_onnx.py), used when present
+    ONNX_MODEL_PATH = os.environ.get('ONNX_MODEL_PATH', 'mental_health_model_final.onnx')
+    # Optional Treelite-compiled library of MODEL_PATH (see export_treelite.py)
+    TREELITE_MODEL_PATH = os.environ.get('TREELITE_MODEL_PATH', 'mental_health_model_final.so')
+    # Optional subset of the ensemble to score with (see prune_ensemble.py), used by the joblib backend
+    PRUNED_ENSEMBLE_PATH = os.environ.get('PRUNED_ENSEMBLE_PATH', 'mental_health_model_final.pruned.pkl')
+    # Accelerated scoring backend: 'onnx', 'treelite' or 'joblib' (falls back to joblib when unavailable)
+    INFERENCE_BACKEND = os.environ.get('INFERENCE_BACKEND', 'onnx')
+    
+    # Prediction batching: concurrent /predict calls are scored together
+    BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', '64'))
+    BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', '5'))
+    
+    # Optional process pool for model scoring (0 scores in the request worker)
+    SCORING_PROCESSES = int(os.environ.get('SCORING_PROCESSES', '0'))
+    SCORING_TIMEOUT_S = float(os.environ.get('SCORING_TIMEOUT_S', '1.0'))
     
     # Feature columns
     FEATURE_COLUMNS = ['Sentiment_Score', 'HRV', 'Sleep_Hours', 'Activity', 'Age', 'Gender', 'Work_Study_Hours']
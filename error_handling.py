@@ -1,8 +1,10 @@
-from flask import jsonify, request
 import traceback
-from datetime import datetime
 import logging
+from functools import lru_cache
+
+import orjson
 from config import Config
+from utils import json_response, now_iso, ojsonify
 
 class MentalHealthError(Exception):
     """Base exception for mental health prediction errors"""
@@ -41,81 +43,52 @@ class CrisisDetectionError(MentalHealthError):
             user_message="Please seek immediate professional help. Contact emergency services or a mental health professional."
         )
 
+# Range-check messages, formatted only when a check fails
+_OUT_OF_RANGE = "{field} must be between {lo} and {hi}, got {val}"
+_NEGATIVE = "{field} cannot be negative, got {val}"
+_UNUSUALLY_HIGH = "{field} seems unusually high ({val}), please verify"
+_EXCEEDS = "{field} cannot exceed {hi}, got {val}"
+
+# field -> (caster, expected type, lower bound, upper bound, below-range message, above-range message)
+_VALIDATORS = {
+    'Sentiment_Score': (float, 'a number', 0, 1, _OUT_OF_RANGE, _OUT_OF_RANGE),
+    'HRV': (float, 'a number', 0, 200, _NEGATIVE, _UNUSUALLY_HIGH),
+    'Sleep_Hours': (float, 'a number', 0, 24, _NEGATIVE, _EXCEEDS),
+    'Activity': (int, 'a whole number', 0, 100000, _NEGATIVE, _UNUSUALLY_HIGH),
+    'Age': (int, 'a whole number', 0, 120, _NEGATIVE, _UNUSUALLY_HIGH),
+    'Work_Study_Hours': (float, 'a number', 0, 24, _NEGATIVE, _EXCEEDS),
+}
+_GENDERS = frozenset(('Male', 'Female'))
+# (field, rule) in feature order, resolved once; Gender's rule is None
+_FIELD_RULES = tuple((field, _VALIDATORS.get(field)) for field in Config.FEATURE_COLUMNS)
+
 def validate_input_data(data):
     """Comprehensive input validation"""
     errors = []
     
-    # Required fields check
-    required_fields = Config.FEATURE_COLUMNS
-    for field in required_fields:
+    for field, rule in _FIELD_RULES:
         if field not in data:
             errors.append(f"Missing required field: {field}")
             continue
             
         value = data[field]
         
-        # Type and range validation
-        if field == 'Sentiment_Score':
-            try:
-                val = float(value)
-                if not (0 <= val <= 1):
-                    errors.append(f"Sentiment_Score must be between 0 and 1, got {val}")
-            except (ValueError, TypeError):
-                errors.append(f"Sentiment_Score must be a number, got {type(value).__name__}")
-                
-        elif field == 'HRV':
-            try:
-                val = float(value)
-                if val < 0:
-                    errors.append(f"HRV cannot be negative, got {val}")
-                elif val > 200:  # Reasonable upper bound
-                    errors.append(f"HRV seems unusually high ({val}), please verify")
-            except (ValueError, TypeError):
-                errors.append(f"HRV must be a number, got {type(value).__name__}")
-                
-        elif field == 'Sleep_Hours':
-            try:
-                val = float(value)
-                if val < 0:
-                    errors.append(f"Sleep_Hours cannot be negative, got {val}")
-                elif val > 24:
-                    errors.append(f"Sleep_Hours cannot exceed 24, got {val}")
-            except (ValueError, TypeError):
-                errors.append(f"Sleep_Hours must be a number, got {type(value).__name__}")
-                
-        elif field == 'Activity':
-            try:
-                val = int(value)
-                if val < 0:
-                    errors.append(f"Activity cannot be negative, got {val}")
-                elif val > 100000:  # Reasonable upper bound
-                    errors.append(f"Activity seems unusually high ({val}), please verify")
-            except (ValueError, TypeError):
-                errors.append(f"Activity must be a whole number, got {type(value).__name__}")
-                
-        elif field == 'Age':
-            try:
-                val = int(value)
-                if val < 0:
-                    errors.append(f"Age cannot be negative, got {val}")
-                elif val > 120:
-                    errors.append(f"Age seems unusually high ({val}), please verify")
-            except (ValueError, TypeError):
-                errors.append(f"Age must be a whole number, got {type(value).__name__}")
-                
-        elif field == 'Gender':
-            if value not in ['Male', 'Female']:
+        if rule is None:
+            # Gender is the only categorical field
+            if not isinstance(value, str) or value not in _GENDERS:
                 errors.append(f"Gender must be 'Male' or 'Female', got '{value}'")
-                
-        elif field == 'Work_Study_Hours':
-            try:
-                val = float(value)
-                if val < 0:
-                    errors.append(f"Work_Study_Hours cannot be negative, got {val}")
-                elif val > 24:
-                    errors.append(f"Work_Study_Hours cannot exceed 24, got {val}")
-            except (ValueError, TypeError):
-                errors.append(f"Work_Study_Hours must be a number, got {type(value).__name__}")
+            continue
+        
+        caster, expected, lo, hi, low_msg, high_msg = rule
+        try:
+            val = caster(value)
+        except (ValueError, TypeError):
+            errors.append(f"{field} must be {expected}, got {type(value).__name__}")
+            continue
+        
+        if not lo <= val <= hi:
+            msg = high_msg if val > hi else low_msg
+            errors.append(msg.format(field=field, lo=lo, hi=hi, val=val))
     
     if errors:
         raise ValidationError("input_data", data, "; ".join(errors))
@@ -128,19 +101,19 @@ def handle_error(error):
     
     if isinstance(error, MentalHealthError):
         logger.warning(f"MentalHealthError: {error.message}")
-        return jsonify({
+        return ojsonify({
             'error': error.user_message,
             'error_code': error.error_code,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         }), 400
     
     elif isinstance(error, ValidationError):
         logger.warning(f"ValidationError: {error.message}")
-        return jsonify({
+        return ojsonify({
             'error': error.user_message,
             'error_code': error.error_code,
             'field': error.field,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         }), 400
     
     else:
@@ -148,24 +121,39 @@ def handle_error(error):
         logger.error(f"Unexpected error: {str(error)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         
-        return jsonify({
+        return ojsonify({
             'error': 'An unexpected error occurred. Please try again later.',
             'error_code': 'INTERNAL_ERROR',
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': now_iso()
         }), 500
 
+@lru_cache(maxsize=64)
+def _encoded(text):
+    """JSON-encode a string; labels, disclaimers and chatbot messages repeat, so cache them"""
+    return orjson.dumps(text)
+
+# Fixed fragments of the success response, in key order
+_SUCCESS_PREFIX = b'{"prediction":'
+_SUCCESS_PROBABILITIES = b',"probabilities":'
+_SUCCESS_DISCLAIMER = b',"disclaimer":'
+_SUCCESS_MODEL_ACCURACY = b',"model_accuracy":' + orjson.dumps('This model has a cross-validation accuracy of 80.8%.')
+_SUCCESS_CHATBOT = b',"chatbot_message":'
+_SUCCESS_PROCESSING_TIME = b',"processing_time_ms":'
+_SUCCESS_TIMESTAMP = b',"timestamp":'
+_SUCCESS_SUFFIX = b',"status":"success"}'
+
 def create_success_response(prediction, probabilities, disclaimer, chatbot_message, processing_time):
     """Create standardized success response"""
-    return jsonify({
-        'prediction': prediction,
-        'probabilities': probabilities,
-        'disclaimer': disclaimer,
-        'model_accuracy': 'This model has a cross-validation accuracy of 80.8%.',
-        'chatbot_message': chatbot_message,
-        'processing_time_ms': round(processing_time * 1000, 2),
-        'timestamp': datetime.utcnow().isoformat(),
-        'status': 'success'
-    })
+    return json_response(b''.join((
+        _SUCCESS_PREFIX, _encoded(prediction),
+        _SUCCESS_PROBABILITIES, orjson.dumps(probabilities, option=orjson.OPT_SERIALIZE_NUMPY),
+        _SUCCESS_DISCLAIMER, _encoded(disclaimer),
+        _SUCCESS_MODEL_ACCURACY,
+        _SUCCESS_CHATBOT, _encoded(chatbot_message),
+        _SUCCESS_PROCESSING_TIME, orjson.dumps(round(processing_time * 1000, 2)),
+        _SUCCESS_TIMESTAMP, orjson.dumps(now_iso()),
+        _SUCCESS_SUFFIX
+    )))
 
 def check_crisis_conditions(prediction, probabilities):
     """Check if prediction indicates crisis conditions"""
@@ -0,0 +1,55 @@
+"""Export the trained model to ONNX for faster inference with onnxruntime.
+
+Run once after (re)training:
+
+    pip install onnxmltools skl2onnx
+    python export_onnx.py
+
+app_enhanced.py picks up Config.ONNX_MODEL_PATH automatically when it exists.
+"""
+import copy
+
+import joblib
+import numpy as np
+
+from config import Config
+
+
+def convert_model(model, n_features):
+    """Convert an XGBoost or scikit-learn classifier to an ONNX model"""
+    if type(model).__module__.startswith('xgboost'):
+        from onnxmltools import convert_xgboost
+        from onnxmltools.convert.common.data_types import FloatTensorType
+
+        # The converter only understands positional feature names (f0, f1, ...)
+        model = copy.deepcopy(model)
+        model.get_booster().feature_names = None
+        return convert_xgboost(model, initial_types=[('input', FloatTensorType([None, n_features]))])
+
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+
+    return convert_sklearn(
+        model,
+        initial_types=[('input', FloatTensorType([None, n_features]))],
+        options={id(model): {'zipmap': False}}
+    )
+
+
+def main():
+    model = joblib.load(Config.MODEL_PATH)
+    n_features = len(Config.FEATURE_COLUMNS)
+    onnx_model = convert_model(model, n_features)
+
+    with open(Config.ONNX_MODEL_PATH, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+
+    # Sanity check the exported graph against the original model
+    from inference import OnnxPredictor
+    sample = np.random.default_rng(0).normal(size=(100, n_features))
+    max_diff = np.abs(OnnxPredictor(Config.ONNX_MODEL_PATH).predict_proba(sample) - model.predict_proba(sample)).max()
+    print(f"Exported {Config.MODEL_PATH} to {Config.ONNX_MODEL_PATH} (max probability difference {max_diff:.2e})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""Compile the trained model to a native shared library with Treelite.
+
+Run once after (re)training, on the machine (or image) that will serve it:
+
+    pip install treelite tl2cgen
+    python export_treelite.py
+
+Then start the app with INFERENCE_BACKEND=treelite to score with the
+compiled library at Config.TREELITE_MODEL_PATH.
+"""
+import os
+
+import joblib
+import numpy as np
+
+from config import Config
+
+
+def import_model(model):
+    """Convert an XGBoost or scikit-learn tree ensemble to a Treelite model"""
+    import treelite
+
+    if type(model).__module__.startswith('xgboost'):
+        booster = model.get_booster().copy()
+        # Treelite only understands positional feature names (f0, f1, ...)
+        booster.feature_names = None
+        return treelite.frontend.from_xgboost(booster)
+    return treelite.sklearn.import_model(model)
+
+
+def main():
+    import tl2cgen
+
+    model = joblib.load(Config.MODEL_PATH)
+    tl2cgen.export_lib(
+        import_model(model),
+        toolchain='gcc',
+        libpath=Config.TREELITE_MODEL_PATH,
+        # Store split thresholds as integer indices into a table of unique
+        # values, so the compiled comparisons are on narrow integers
+        params={'quantize': 1, 'parallel_comp': os.cpu_count() or 1}
+    )
+
+    # Sanity check the compiled library against the original model
+    from inference import TreelitePredictor
+    sample = np.random.default_rng(0).normal(size=(100, len(Config.FEATURE_COLUMNS)))
+    max_diff = np.abs(TreelitePredictor(Config.TREELITE_MODEL_PATH).predict_proba(sample) - model.predict_proba(sample)).max()
+    print(f"Compiled {Config.MODEL_PATH} to {Config.TREELITE_MODEL_PATH} (max probability difference {max_diff:.2e})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""Gunicorn settings for serving the prediction API in production.
+
+    gunicorn -c gunicorn_conf.py app_enhanced:app
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Model scoring is CPU-bound, so scale with processes rather than threads
+workers = int(os.environ.get('WEB_CONCURRENCY', (2 * (os.cpu_count() or 1)) + 1))
+
+# Every worker is already a separate process, so keep the model's native
+# thread pools (XGBoost/OpenMP) to one thread each to avoid oversubscribing
+# the cores; set MODEL_N_JOBS explicitly to override
+os.environ.setdefault('MODEL_N_JOBS', '1')
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+# A few threads per worker keep the I/O-light endpoints (/health, /privacy,
+# /feedback, /calculate_sentiment) from queueing behind slow clients, and let
+# concurrent /predict calls be coalesced by the prediction batcher
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', '4'))
+
+# Load the models once in the master and fork workers from it so the
+# loaded artifacts are shared copy-on-write
+preload_app = True
+
+# Recycle workers periodically to bound memory growth
+max_requests = 1000
+max_requests_jitter = 50
@@ -0,0 +1,372 @@
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import joblib
+import numpy as np
+
+try:
+    import onnxruntime
+except ImportError:  # optional accelerated backend
+    onnxruntime = None
+
+try:
+    import tl2cgen
+except ImportError:  # optional compiled-model backend
+    tl2cgen = None
+
+
+class OnnxPredictor:
+    """Score rows with an ONNX Runtime session exported from the trained model"""
+
+    def __init__(self, path):
+        options = onnxruntime.SessionOptions()
+        # Single rows and small batches don't benefit from intra-op threading
+        options.intra_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            path, options, providers=['CPUExecutionProvider']
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        self.output_names = ['probabilities']
+
+    def predict_proba(self, rows):
+        """Return class probabilities for an (N, n_features) array"""
+        return self.session.run(
+            self.output_names, {self.input_name: rows.astype(np.float32)}
+        )[0]
+
+
+def load_onnx_predictor(path):
+    """Load the ONNX model at ``path``, or return None if it can't be used"""
+    logger = logging.getLogger(__name__)
+    if onnxruntime is None:
+        logger.info("onnxruntime not installed, using the joblib model for inference")
+        return None
+    if not os.path.exists(path):
+        logger.info(f"ONNX model {path} not found, using the joblib model for inference")
+        return None
+    try:
+        return OnnxPredictor(path)
+    except Exception as e:
+        logger.warning(f"Failed to load ONNX model {path}: {str(e)}")
+        return None
+
+
+class TreelitePredictor:
+    """Score rows with a model compiled to a native library by Treelite (see export_treelite.py)"""
+
+    def __init__(self, path):
+        self.predictor = tl2cgen.Predictor(path, nthread=1)
+
+    def predict_proba(self, rows):
+        """Return class probabilities for an (N, n_features) array"""
+        out = self.predictor.predict(tl2cgen.DMatrix(rows.astype(np.float32)))
+        return out.reshape(len(rows), -1)
+
+
+def load_treelite_predictor(path):
+    """Load the compiled model library at ``path``, or return None if it can't be used"""
+    logger = logging.getLogger(__name__)
+    if tl2cgen is None:
+        logger.info("tl2cgen not installed, using the joblib model for inference")
+        return None
+    if not os.path.exists(path):
+        logger.info(f"Compiled model {path} not found, using the joblib model for inference")
+        return None
+    try:
+        return TreelitePredictor(path)
+    except Exception as e:
+        logger.warning(f"Failed to load compiled model {path}: {str(e)}")
+        return None
+
+
+_NATIVE_LOADERS = {'onnx': load_onnx_predictor, 'treelite': load_treelite_predictor}
+
+
+def load_native_predictor(backend, path):
+    """Load the accelerated predictor for ``backend`` ('onnx' or 'treelite'), or None for 'joblib'"""
+    loader = _NATIVE_LOADERS.get(backend)
+    if loader is None:
+        if backend != 'joblib':
+            logging.getLogger(__name__).warning(f"Unknown inference backend {backend!r}, using the joblib model")
+        return None
+    return loader(path)
+
+
+class PrunedEnsemble:
+    """predict_proba over the subset of an ensemble chosen by prune_ensemble.py
+
+    Boosted models keep only their first ``n_iterations`` rounds; bagged
+    forests average the ``active_indices`` trees using ``weights``, skipping
+    the rest entirely.
+    """
+
+    def __init__(self, model, n_iterations=None, active_indices=None, weights=None):
+        self.model = model
+        self.n_iterations = n_iterations
+        if n_iterations is None:
+            self.estimators = [model.estimators_[i] for i in active_indices]
+            self.weights = np.asarray(weights, dtype=np.float64)
+
+    def predict_proba(self, rows):
+        """Return class probabilities for an (N, n_features) array"""
+        if self.n_iterations is not None:
+            return self.model.predict_proba(rows, iteration_range=(0, self.n_iterations))
+        probs = self.weights[0] * self.estimators[0].predict_proba(rows)
+        for weight, estimator in zip(self.weights[1:], self.estimators[1:]):
+            probs += weight * estimator.predict_proba(rows)
+        return probs
+
+
+def load_pruned_ensemble(model, path):
+    """Wrap ``model`` with the pruning spec saved at ``path``, or return None if there isn't one"""
+    if not os.path.exists(path):
+        return None
+    logger = logging.getLogger(__name__)
+    try:
+        return PrunedEnsemble(model, **joblib.load(path))
+    except Exception as e:
+        logger.warning(f"Failed to load ensemble pruning spec {path}: {str(e)}")
+        return None
+
+
+# Model loaded by _init_scoring_process in each ScoringPool child
+_process_model = None
+
+
+def _init_scoring_process(model_path, mmap_mode, backend, backend_path):
+    """Load the model once per pool process"""
+    global _process_model
+    _process_model = (
+        load_native_predictor(backend, backend_path)
+        or joblib.load(model_path, mmap_mode=mmap_mode)
+    )
+
+
+def _score_in_process(rows):
+    return _process_model.predict_proba(rows)
+
+
+class ScoringPool:
+    """Score already-scaled rows on a pool of model-serving processes
+
+    Only the scaled feature rows and the class probabilities cross the
+    process boundary. The pool is created on first use so that it belongs
+    to the process that uses it, not to a pre-fork parent.
+    """
+
+    def __init__(self, processes, model_path, mmap_mode=None, backend='joblib', backend_path=None, timeout=1.0):
+        self.processes = processes
+        self.initargs = (model_path, mmap_mode, backend, backend_path)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._ready = False
+
+    def _get_executor(self):
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    # spawn avoids forking a process that already runs threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.processes,
+                        mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_scoring_process,
+                        initargs=self.initargs
+                    )
+                    self._pid = os.getpid()
+                    self._ready = False
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Drop a broken executor so the next call starts a fresh pool"""
+        with self._lock:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def predict_proba(self, rows):
+        """Return class probabilities for an (N, n_features) array of scaled rows"""
+        # A pool process that died breaks the whole pool; rebuild it and retry once
+        for retry in (False, True):
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_score_in_process, rows)
+                # The first call also waits for the pool processes to start and load the model
+                result = future.result(timeout=self.timeout if self._ready else None)
+            except BrokenProcessPool:
+                logging.getLogger(__name__).warning("Scoring pool process died, restarting the pool")
+                self._discard_executor(executor)
+                if retry:
+                    raise
+                continue
+            except FutureTimeoutError:
+                # Don't leave the request queued behind whatever is holding up the pool
+                future.cancel()
+                raise
+            self._ready = True
+            return result
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+class FusedStandardScaler:
+    """StandardScaler.transform as a single ``(x - mean) * inv_scale`` expression
+
+    Skips sklearn's per-call input validation, which dominates the cost of
+    scaling one small dense row.
+    """
+
+    __slots__ = ('mean', 'inv_scale')
+
+    def __init__(self, scaler):
+        n_features = scaler.n_features_in_
+        self.mean = (
+            scaler.mean_.astype(np.float64) if scaler.with_mean else np.zeros(n_features)
+        )
+        # scale_ already has zero variances replaced by 1.0
+        self.inv_scale = (
+            1.0 / scaler.scale_.astype(np.float64) if scaler.with_std else np.ones(n_features)
+        )
+
+    def transform(self, rows):
+        return (rows - self.mean) * self.inv_scale
+
+
+def fuse_scaler(scaler):
+    """Return a FusedStandardScaler for a fitted StandardScaler, else the scaler itself"""
+    try:
+        from sklearn.preprocessing import StandardScaler
+    except ImportError:
+        return scaler
+    if type(scaler) is StandardScaler and hasattr(scaler, 'n_features_in_'):
+        return FusedStandardScaler(scaler)
+    return scaler
+
+
+# Per-thread reusable input row so predictions don't allocate an array per request
+_input_local = threading.local()
+
+
+def input_buffer(n_features):
+    """Return this thread's preallocated (1, n_features) float64 input buffer"""
+    buf = getattr(_input_local, 'buf', None)
+    if buf is None or buf.shape[1] != n_features:
+        buf = _input_local.buf = np.empty((1, n_features), dtype=np.float64)
+    return buf
+
+
+class _PendingRow:
+    """A single input row waiting for the batch worker to score it"""
+
+    __slots__ = ('row', 'result', 'error', 'done')
+
+    def __init__(self, row):
+        self.row = row
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class PredictionBatcher:
+    """Coalesce concurrent single-row predictions into one batched model call
+
+    ``score_fn`` receives an (N, n_features) array and must return an array
+    with one row of results per input row. A request that arrives while no
+    other prediction is in flight is scored directly on the calling thread,
+    so isolated requests never wait for the batching window. A batched
+    request gives up with ModelError after the batching window plus
+    ``timeout_s`` (None waits indefinitely).
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=5.0, timeout_s=None):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.wait_timeout = None if timeout_s is None else self.max_wait + timeout_s
+        self.logger = logging.getLogger(__name__)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._worker = None
+
+    def predict(self, row):
+        """Score one 1-D feature row, batching it with concurrent callers"""
+        with self._lock:
+            self._in_flight += 1
+            alone = self._in_flight == 1
+        try:
+            if alone:
+                return self.score_fn(row.reshape(1, -1))[0]
+
+            pending = _PendingRow(row)
+            self._ensure_worker()
+            self._queue.put(pending)
+            if not pending.done.wait(self.wait_timeout):
+                from error_handling import ModelError
+                raise ModelError(f"Batched prediction timed out after {self.wait_timeout:.2f}s")
+            if pending.error is not None:
+                # The error is shared by the whole batch, so raise a new one per caller
+                from error_handling import ModelError
+                raise ModelError(f"Batched prediction failed: {str(pending.error)}") from pending.error
+            return pending.result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _ensure_worker(self):
+        """Start the batch worker thread on first use (after any fork)"""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name='prediction-batcher', daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self):
+        """Block for one row, then gather more until the batch is full or the window closes"""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            try:
+                results = self.score_fn(np.vstack([pending.row for pending in batch]))
+                if len(results) != len(batch):
+                    raise ValueError(f"score_fn returned {len(results)} rows for a batch of {len(batch)}")
+            except BaseException as e:
+                # Release every waiter, even if this thread is about to exit
+                self.logger.error(f"Batched prediction failed for {len(batch)} rows: {str(e)}")
+                for pending in batch:
+                    pending.error = e
+                    pending.done.set()
+                if not isinstance(e, Exception):
+                    raise
+                continue
+
+            for pending, result in zip(batch, results):
+                pending.result = result
+                pending.done.set()
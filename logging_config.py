@@ -1,12 +1,94 @@
+import atexit
+import itertools
 import logging
 import logging.handlers
-from datetime import datetime
-import json
+from datetime import datetime, timezone
 import os
+import queue
+import threading
+import orjson
 from functools import wraps
-from flask import request, g, current_app
 import time
 
+# Logger objects are singletons, so look them up once rather than on every
+# call (getLogger takes the logging module lock); setup_logging configures them
+_prediction_logger = logging.getLogger('prediction')
+_security_logger = logging.getLogger('security')
+
+# (app, listener, queue handler, flush actions) for each setup_logging() call
+# whose listener is still running; restarted in forked children, stopped at exit
+_active_listeners = []
+
+class FastRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that doesn't stat the log file on every record
+
+    The stdlib handler calls os.path.exists and os.path.isfile before each
+    emit so it never rotates special files (bpo-45401). The log paths here
+    don't change type at runtime, so check once when the handler is created.
+
+    With ``buffered=True`` records go into a 64 KiB file buffer instead of
+    being flushed one by one; call sync() periodically to write them out
+    and fdatasync the file. A crash can lose the records since the last sync.
+    Between syncs the rollover check counts this handler's own records; each
+    sync() re-reads the file's real size, so records appended by other
+    processes sharing the file are counted within one sync interval.
+    """
+
+    def __init__(self, filename, *args, buffered=False, **kwargs):
+        # Set before the base class opens the stream through _open()
+        self.buffered = buffered
+        self._size = 0
+        self._pending = 0
+        super().__init__(filename, *args, **kwargs)
+        self._rotatable = not os.path.exists(self.baseFilename) or os.path.isfile(self.baseFilename)
+
+    def _open(self):
+        if not self.buffered:
+            return super()._open()
+        stream = open(self.baseFilename, self.mode, buffering=65536, encoding=self.encoding, errors=self.errors)
+        self._size = stream.seek(0, 2)
+        return stream
+
+    def shouldRollover(self, record):
+        if not self._rotatable:
+            return False
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            msg = "%s\n" % self.format(record)
+            if self.buffered:
+                # seek()/tell() would flush the buffer, so track the size instead
+                self._pending = len(msg)
+                return self._size + self._pending >= self.maxBytes
+            self.stream.seek(0, 2)
+            if self.stream.tell() + len(msg) >= self.maxBytes:
+                return True
+        return False
+
+    def emit(self, record):
+        super().emit(record)
+        # Count the record against whichever file it was written to
+        self._size += self._pending
+        self._pending = 0
+
+    def flush(self):
+        if not self.buffered:
+            super().flush()
+
+    def sync(self):
+        """Write out buffered records and fdatasync the file"""
+        self.acquire()
+        try:
+            if self.stream is not None and not self.stream.closed:
+                self.stream.flush()
+                os.fdatasync(self.stream.fileno())
+                if self.buffered:
+                    # Other workers append to the same file, so pick up its
+                    # real size rather than only counting our own records
+                    self._size = os.fstat(self.stream.fileno()).st_size
+        finally:
+            self.release()
+
 def setup_logging(app):
     """Setup comprehensive logging for the application"""
     
@@ -27,16 +109,17 @@ def setup_logging(app):
     )
     
     # File handler for detailed logs
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = FastRotatingFileHandler(
         'logs/app.log', 
         maxBytes=10*1024*1024,  # 10MB
-        backupCount=5
+        backupCount=5,
+        buffered=True
     )
     file_handler.setFormatter(detailed_formatter)
     file_handler.setLevel(log_level)
     
     # Error file handler
-    error_handler = logging.handlers.RotatingFileHandler(
+    error_handler = FastRotatingFileHandler(
         'logs/error.log',
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
@@ -50,7 +133,7 @@ def setup_logging(app):
     console_handler.setLevel(log_level)
     
     # Security log handler
-    security_handler = logging.handlers.RotatingFileHandler(
+    security_handler = FastRotatingFileHandler(
         'logs/security.log',
         maxBytes=5*1024*1024,  # 5MB
         backupCount=3
@@ -58,96 +141,195 @@ def setup_logging(app):
     security_handler.setFormatter(detailed_formatter)
     security_handler.setLevel(logging.WARNING)
     
-    # Configure root logger
-    app.logger.setLevel(log_level)
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(error_handler)
-    app.logger.addHandler(console_handler)
-    
-    # Create security logger
-    security_logger = logging.getLogger('security')
-    security_logger.addHandler(security_handler)
-    security_logger.setLevel(logging.WARNING)
-    
-    # Create prediction logger
-    prediction_logger = logging.getLogger('prediction')
-    prediction_handler = logging.handlers.RotatingFileHandler(
+    # Prediction log handler
+    prediction_handler = FastRotatingFileHandler(
         'logs/predictions.log',
         maxBytes=20*1024*1024,  # 20MB
-        backupCount=10
+        backupCount=10,
+        buffered=True
     )
-    prediction_handler.setFormatter(detailed_formatter)
-    prediction_logger.addHandler(prediction_handler)
-    prediction_logger.setLevel(logging.INFO)
-
-def log_prediction(user_id, input_data, prediction, probabilities, processing_time, ip_address):
-    """Log prediction details for analytics and monitoring"""
-    prediction_logger = logging.getLogger('prediction')
+    # Records are already JSON with their own timestamp, so write them as plain JSON lines
+    prediction_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    # Buffer prediction records so a burst of predictions is written in one
+    # go; flushed when full, on errors and at least once a second
+    prediction_buffer = logging.handlers.MemoryHandler(
+        capacity=256,
+        flushLevel=logging.ERROR,
+        target=prediction_handler,
+        flushOnClose=True
+    )
+    
+    # All handlers share one listener thread, so each only accepts records
+    # from the logger it used to be attached to
+    for handler in (file_handler, error_handler, console_handler):
+        handler.addFilter(logging.Filter(app.logger.name))
+    security_handler.addFilter(logging.Filter('security'))
+    prediction_buffer.addFilter(logging.Filter('prediction'))
+    
+    # QueueHandler.prepare() still merges the message args and traceback on the
+    # request thread; the listener thread runs the handlers' formatters and file I/O
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        file_handler, error_handler, console_handler, security_handler, prediction_buffer,
+        respect_handler_level=True
+    )
+    listener.start()
+    app.extensions['log_listener'] = listener
+    # app.log and predictions.log are buffered; error and security records
+    # are still written as they arrive
+    flush_actions = (prediction_buffer.flush, prediction_handler.sync, file_handler.sync)
+    _start_flusher(flush_actions)
+    if not _active_listeners:
+        atexit.register(_stop_listeners)
+        # A forked worker (gunicorn --preload) inherits the queue but not the
+        # listener and flush threads, so give it a fresh queue and threads of its own
+        os.register_at_fork(after_in_child=_restart_listeners)
+    _active_listeners.append((app, listener, queue_handler, flush_actions))
+    
+    # Configure root logger
+    app.logger.setLevel(log_level)
+    app.logger.addHandler(queue_handler)
+    
+    # Configure security logger
+    _security_logger.addHandler(queue_handler)
+    _security_logger.setLevel(logging.WARNING)
     
+    # Configure prediction logger
+    _prediction_logger.addHandler(queue_handler)
+    _prediction_logger.setLevel(logging.INFO)
+
+def _start_flusher(actions, interval=1.0):
+    """Call each of ``actions`` in order every ``interval`` seconds from a daemon thread"""
+    logger = logging.getLogger(__name__)
+    def run():
+        while True:
+            time.sleep(interval)
+            for action in actions:
+                try:
+                    action()
+                except Exception as e:
+                    logger.error(f"Periodic log flush failed: {str(e)}")
+    threading.Thread(target=run, name='log-flusher', daemon=True).start()
+
+def _stop_listeners():
+    """Stop the listeners started by setup_logging, writing out their queued records"""
+    while _active_listeners:
+        _active_listeners.pop()[1].stop()
+
+def _restart_listeners():
+    """Give each listener a new queue, listener thread and flush thread in a forked child"""
+    for i, (app, listener, queue_handler, flush_actions) in enumerate(_active_listeners):
+        log_queue = queue.SimpleQueue()
+        queue_handler.queue = log_queue
+        listener = logging.handlers.QueueListener(
+            log_queue, *listener.handlers, respect_handler_level=listener.respect_handler_level
+        )
+        listener.start()
+        app.extensions['log_listener'] = listener
+        _active_listeners[i] = (app, listener, queue_handler, flush_actions)
+        _start_flusher(flush_actions)
+
+def request_now():
+    """UTC time captured when the current request started, or the current time outside a request"""
+    from flask import g, has_request_context
+    if has_request_context() and 'now' in g:
+        return g.now
+    return datetime.now(timezone.utc)
+
+def _request_user_agent():
+    """User agent of the current request, as captured by log_request_info"""
+    from flask import g, request
+    return g.get('user_agent') or request.headers.get('User-Agent', 'Unknown')
+
+def log_prediction(user_id, input_data, prediction, probabilities, processing_time, ip_address, user_agent=None):
+    """Log prediction details for analytics and monitoring
+
+    Pass ``user_agent`` to log outside a request context.
+    """
     log_data = {
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': request_now(),
         'user_id': user_id,
         'ip_address': ip_address,
         'input_data': input_data,
         'prediction': prediction,
         'probabilities': probabilities,
         'processing_time_ms': processing_time * 1000,
-        'user_agent': request.headers.get('User-Agent', 'Unknown')
+        'user_agent': user_agent or _request_user_agent()
     }
     
-    prediction_logger.info(json.dumps(log_data))
+    _prediction_logger.info(orjson.dumps(log_data, option=orjson.OPT_NAIVE_UTC).decode())
 
-def log_security_event(event_type, details, ip_address=None):
-    """Log security-related events"""
-    security_logger = logging.getLogger('security')
-    
+def log_security_event(event_type, details, ip_address=None, user_agent=None):
+    """Log security-related events
+
+    Pass ``ip_address`` and ``user_agent`` to log outside a request context.
+    """
+    if ip_address is None:
+        from flask import request
+        ip_address = request.remote_addr
     log_data = {
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': request_now(),
         'event_type': event_type,
         'details': details,
-        'ip_address': ip_address or request.remote_addr,
-        'user_agent': request.headers.get('User-Agent', 'Unknown')
+        'ip_address': ip_address,
+        'user_agent': user_agent or _request_user_agent()
     }
     
-    security_logger.warning(json.dumps(log_data))
+    _security_logger.warning(orjson.dumps(log_data, option=orjson.OPT_NAIVE_UTC).decode())
 
 def log_performance(func):
     """Decorator to log function performance"""
+    from flask import current_app
+    
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             result = func(*args, **kwargs)
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             
             current_app.logger.info(
-                f"Function {func.__name__} completed successfully in {processing_time:.4f}s"
+                "Function %s completed successfully in %.4fs", func.__name__, processing_time
             )
             return result
         except Exception as e:
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             current_app.logger.error(
-                f"Function {func.__name__} failed after {processing_time:.4f}s: {str(e)}"
+                "Function %s failed after %.4fs: %s", func.__name__, processing_time, e
             )
             raise
     return wrapper
 
+# Disambiguates request ids generated within the same nanosecond
+_request_counter = itertools.count()
+
 def log_request_info():
     """Log request information for monitoring"""
-    g.start_time = time.time()
-    g.request_id = datetime.utcnow().strftime('%Y%m%d_%H%M%S_%f')
+    from flask import current_app, g, request
+    
+    g.start_time = time.perf_counter()
+    # One wall-clock timestamp shared by everything logged for this request
+    g.now = datetime.now(timezone.utc)
+    g.request_id = f"{time.time_ns():x}-{next(_request_counter):x}"
+    # Read once so later log calls don't go back to the request headers
+    g.user_agent = request.headers.get('User-Agent', 'Unknown')
     
     current_app.logger.info(
-        f"Request {g.request_id}: {request.method} {request.path} "
-        f"from {request.remote_addr}"
+        "Request %s: %s %s from %s",
+        g.request_id, request.method, request.path, request.remote_addr
     )
 
 def log_response_info(response):
     """Log response information"""
+    from flask import current_app, g
+    
     if hasattr(g, 'start_time'):
-        processing_time = time.time() - g.start_time
+        processing_time = time.perf_counter() - g.start_time
         current_app.logger.info(
-            f"Request {g.request_id}: Completed in {processing_time:.4f}s "
-            f"with status {response.status_code}"
+            "Request %s: Completed in %.4fs with status %s",
+            g.request_id, processing_time, response.status_code
         )
     return response
@@ -1,6 +1,25 @@
-from datetime import datetime
-from flask import jsonify, request
+from flask import request
 import logging
+from functools import lru_cache
+from types import MappingProxyType
+import orjson
+from logging_config import request_now
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def _thaw(value):
+    """Plain dict/list copy of a value built by _freeze"""
+    if isinstance(value, MappingProxyType):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
 
 class MedicalGuidance:
     """Class to handle medical disclaimers and professional guidance"""
@@ -131,66 +150,33 @@ class MedicalGuidance:
         }
     }
     
+    # Read-only copies the getters serve from; each caller gets its own
+    # plain copy, so no caller can change the tables for later requests
+    _CRISIS_HOTLINES = _freeze(CRISIS_HOTLINES)
+    _PROFESSIONAL_RESOURCES = _freeze(PROFESSIONAL_RESOURCES)
+    _SELF_CARE_RECOMMENDATIONS = _freeze(SELF_CARE_RECOMMENDATIONS)
+    
     @staticmethod
     def get_crisis_resources(country_code='US'):
         """Get crisis resources for a specific country"""
-        return MedicalGuidance.CRISIS_HOTLINES.get(country_code, MedicalGuidance.CRISIS_HOTLINES['US'])
+        hotlines = MedicalGuidance._CRISIS_HOTLINES
+        return _thaw(hotlines.get(country_code, hotlines['US']))
     
     @staticmethod
     def get_professional_guidance(profession_type='psychologists'):
         """Get information about professional mental health resources"""
-        return MedicalGuidance.PROFESSIONAL_RESOURCES.get(profession_type, {})
+        return _thaw(MedicalGuidance._PROFESSIONAL_RESOURCES.get(profession_type, MappingProxyType({})))
     
     @staticmethod
     def get_self_care_recommendations(status):
         """Get self-care recommendations based on mental health status"""
-        return MedicalGuidance.SELF_CARE_RECOMMENDATIONS.get(status, {})
+        return _thaw(MedicalGuidance._SELF_CARE_RECOMMENDATIONS.get(status, MappingProxyType({})))
     
     @staticmethod
     def create_enhanced_disclaimer(prediction, confidence, probabilities):
         """Create enhanced medical disclaimer based on prediction"""
-        disclaimers = []
-        
-        # Base disclaimer
-        base_disclaimer = (
-            "⚠️ IMPORTANT MEDICAL DISCLAIMER: This prediction is for informational purposes only "
-            "and should not replace professional medical advice, diagnosis, or treatment. "
-            "Mental health assessment requires evaluation by qualified healthcare professionals."
-        )
-        disclaimers.append(base_disclaimer)
-        
-        # Confidence-based disclaimer
-        if confidence < 0.7:
-            disclaimers.append(
-                f"⚠️ LOW CONFIDENCE WARNING: This prediction has low confidence ({confidence:.1%}). "
-                "Please consult a mental health professional for an accurate assessment."
-            )
-        
-        # Status-specific disclaimers
-        if prediction == "Low":
-            disclaimers.append(
-                "🚨 CRISIS ALERT: If you're experiencing thoughts of self-harm or suicide, "
-                "please seek immediate help from emergency services or a crisis hotline."
-            )
-        elif prediction == "Moderate":
-            disclaimers.append(
-                "💡 RECOMMENDATION: Consider scheduling a check-in with a mental health professional "
-                "to discuss your current mental health status and develop coping strategies."
-            )
-        elif prediction == "High":
-            disclaimers.append(
-                "✅ POSITIVE STATUS: While your mental health appears stable, continue maintaining "
-                "healthy habits and consider supporting others who may be struggling."
-            )
-        
-        # General guidance
-        disclaimers.append(
-            "📞 SUPPORT AVAILABLE: Remember that help is always available. "
-            "Don't hesitate to reach out to mental health professionals, crisis hotlines, "
-            "or trusted friends and family members."
-        )
-        
-        return "\n\n".join(disclaimers)
+        # The text only depends on the formatted confidence, and only when it's below 70%
+        return _enhanced_disclaimer(prediction, f"{confidence:.1%}" if confidence < 0.7 else None)
     
     @staticmethod
     def log_crisis_detection(user_id, prediction_data, ip_address):
@@ -198,7 +184,7 @@ class MedicalGuidance:
         logger = logging.getLogger('crisis_detection')
         
         crisis_data = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': request_now(),
             'user_id': user_id,
             'prediction': prediction_data.get('prediction'),
             'confidence': prediction_data.get('confidence'),
@@ -208,7 +194,7 @@ class MedicalGuidance:
             'crisis_level': 'HIGH' if prediction_data.get('prediction') == 'Low' else 'MODERATE'
         }
         
-        logger.critical(f"CRISIS DETECTED: {crisis_data}")
+        logger.critical(f"CRISIS DETECTED: {orjson.dumps(crisis_data, option=orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY).decode()}")
         
         # In a real application, you might want to:
         # 1. Send alerts to mental health professionals
@@ -217,8 +203,54 @@ class MedicalGuidance:
         
         return crisis_data
 
-def create_professional_guidance_response(prediction, confidence, country_code='US'):
-    """Create comprehensive professional guidance response"""
+@lru_cache(maxsize=512)
+def _enhanced_disclaimer(prediction, confidence_pct):
+    """Build the disclaimer text; ``confidence_pct`` is None when confidence is high enough to omit"""
+    disclaimers = []
+    
+    # Base disclaimer
+    base_disclaimer = (
+        "⚠️ IMPORTANT MEDICAL DISCLAIMER: This prediction is for informational purposes only "
+        "and should not replace professional medical advice, diagnosis, or treatment. "
+        "Mental health assessment requires evaluation by qualified healthcare professionals."
+    )
+    disclaimers.append(base_disclaimer)
+    
+    # Confidence-based disclaimer
+    if confidence_pct is not None:
+        disclaimers.append(
+            f"⚠️ LOW CONFIDENCE WARNING: This prediction has low confidence ({confidence_pct}). "
+            "Please consult a mental health professional for an accurate assessment."
+        )
+    
+    # Status-specific disclaimers
+    if prediction == "Low":
+        disclaimers.append(
+            "🚨 CRISIS ALERT: If you're experiencing thoughts of self-harm or suicide, "
+            "please seek immediate help from emergency services or a crisis hotline."
+        )
+    elif prediction == "Moderate":
+        disclaimers.append(
+            "💡 RECOMMENDATION: Consider scheduling a check-in with a mental health professional "
+            "to discuss your current mental health status and develop coping strategies."
+        )
+    elif prediction == "High":
+        disclaimers.append(
+            "✅ POSITIVE STATUS: While your mental health appears stable, continue maintaining "
+            "healthy habits and consider supporting others who may be struggling."
+        )
+    
+    # General guidance
+    disclaimers.append(
+        "📞 SUPPORT AVAILABLE: Remember that help is always available. "
+        "Don't hesitate to reach out to mental health professionals, crisis hotlines, "
+        "or trusted friends and family members."
+    )
+    
+    return "\n\n".join(disclaimers)
+
+def _build_professional_guidance(prediction, country_code):
+    """Build the professional guidance block for a prediction and country"""
     
     # Get crisis resources
     crisis_resources = MedicalGuidance.get_crisis_resources(country_code)
@@ -226,9 +258,6 @@ def create_professional_guidance_response(prediction, confidence, country_code='
     # Get self-care recommendations
     self_care = MedicalGuidance.get_self_care_recommendations(prediction)
     
-    # Create enhanced disclaimer
-    disclaimer = MedicalGuidance.create_enhanced_disclaimer(prediction, confidence, {})
-    
     # Professional guidance based on prediction
     if prediction == "Low":
         professional_guidance = {
@@ -270,8 +299,25 @@ def create_professional_guidance_response(prediction, confidence, country_code='
             "self_care": self_care
         }
     
+    return professional_guidance
+
+# Guidance blocks never change for a given prediction and country, so build them once
+_PRECOMPUTED_GUIDANCE = {
+    (prediction, country_code): _freeze(_build_professional_guidance(prediction, country_code))
+    for prediction in MedicalGuidance.SELF_CARE_RECOMMENDATIONS
+    for country_code in MedicalGuidance.CRISIS_HOTLINES
+}
+
+def create_professional_guidance_response(prediction, confidence, country_code='US'):
+    """Create comprehensive professional guidance response"""
+    professional_guidance = _PRECOMPUTED_GUIDANCE.get((prediction, country_code))
+    if professional_guidance is None:
+        professional_guidance = _build_professional_guidance(prediction, country_code)
+    else:
+        professional_guidance = _thaw(professional_guidance)
+    
     return {
-        "disclaimer": disclaimer,
+        "disclaimer": MedicalGuidance.create_enhanced_disclaimer(prediction, confidence, {}),
         "professional_guidance": professional_guidance,
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": request_now().isoformat()
     }
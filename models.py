@@ -1,18 +1,66 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declared_attr
+from sqlalchemy.sql import func
+from sqlalchemy.types import BINARY, TypeDecorator
 from datetime import datetime
+import hashlib
 import uuid
 
 db = SQLAlchemy()
 
-class User(db.Model):
+class UUIDType(TypeDecorator):
+    """UUID stored in 16 bytes (native UUID on PostgreSQL), exposed as its string form"""
+    impl = BINARY(16)
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=False))
+        return dialect.type_descriptor(BINARY(16))
+    
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return uuid.UUID(str(value)).bytes
+    
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return str(uuid.UUID(bytes=value))
+
+class UserAgent(db.Model):
+    """Distinct User-Agent strings, referenced by id instead of repeated on every row"""
+    __tablename__ = 'user_agents'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    sha1 = db.Column(BINARY(20), unique=True, nullable=False)
+    text = db.Column(db.Text, nullable=False)
+
+class UserAgentMixin:
+    """Adds a user_agent_id reference and a read-only user_agent text property"""
+    
+    @declared_attr
+    def user_agent_id(cls):
+        return db.Column(db.Integer, db.ForeignKey('user_agents.id'), nullable=True)
+    
+    @declared_attr
+    def user_agent_ref(cls):
+        return db.relationship('UserAgent')
+    
+    @property
+    def user_agent(self):
+        return self.user_agent_ref.text if self.user_agent_ref is not None else None
+
+class User(UserAgentMixin, db.Model):
     """User model for tracking user sessions and preferences"""
     __tablename__ = 'users'
     
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(UUIDType(), primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = db.Column(db.String(36), unique=True, nullable=False)
     ip_address = db.Column(db.String(45), nullable=True)
-    user_agent = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=func.now(), server_default=func.now())
     last_activity = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
@@ -20,12 +68,17 @@ class User(db.Model):
     predictions = db.relationship('Prediction', backref='user', lazy=True, cascade='all, delete-orphan')
     feedback = db.relationship('Feedback', backref='user', lazy=True, cascade='all, delete-orphan')
 
-class Prediction(db.Model):
+class Prediction(UserAgentMixin, db.Model):
     """Model for storing prediction requests and results"""
     __tablename__ = 'predictions'
+    __table_args__ = (
+        # Also serves lookups by user_id alone
+        db.Index('ix_pred_user_created', 'user_id', 'created_at'),
+        db.Index('ix_pred_crisis', 'crisis_detected', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(UUIDType(), db.ForeignKey('users.id'), nullable=False)
     
     # Input data
     sentiment_score = db.Column(db.Float, nullable=False)
@@ -46,8 +99,7 @@ class Prediction(db.Model):
     # Metadata
     processing_time_ms = db.Column(db.Float, nullable=False)
     ip_address = db.Column(db.String(45), nullable=True)
-    user_agent = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=func.now(), server_default=func.now())
     
     # Crisis detection
     crisis_detected = db.Column(db.Boolean, default=False)
@@ -58,8 +110,8 @@ class Feedback(db.Model):
     __tablename__ = 'feedback'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    prediction_id = db.Column(db.Integer, db.ForeignKey('predictions.id'), nullable=True)
+    user_id = db.Column(UUIDType(), db.ForeignKey('users.id'), nullable=False, index=True)
+    prediction_id = db.Column(db.Integer, db.ForeignKey('predictions.id'), nullable=True, index=True)
     
     # Feedback data
     prediction_accurate = db.Column(db.Boolean, nullable=False)
@@ -68,7 +120,7 @@ class Feedback(db.Model):
     rating = db.Column(db.Integer, nullable=True)  # 1-5 scale
     
     # Metadata
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=func.now(), server_default=func.now())
     ip_address = db.Column(db.String(45), nullable=True)
 
 class SystemMetrics(db.Model):
@@ -89,11 +141,14 @@ class SystemMetrics(db.Model):
     # Time period
     period_start = db.Column(db.DateTime, nullable=False)
     period_end = db.Column(db.DateTime, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=func.now(), server_default=func.now())
 
-class SecurityEvent(db.Model):
+class SecurityEvent(UserAgentMixin, db.Model):
     """Model for storing security-related events"""
     __tablename__ = 'security_events'
+    __table_args__ = (
+        db.Index('ix_sec_type_created', 'event_type', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     
@@ -104,12 +159,11 @@ class SecurityEvent(db.Model):
     
     # Request details
     ip_address = db.Column(db.String(45), nullable=True)
-    user_agent = db.Column(db.Text, nullable=True)
     request_path = db.Column(db.String(200), nullable=True)
     request_method = db.Column(db.String(10), nullable=True)
     
     # Metadata
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=func.now(), server_default=func.now())
     resolved = db.Column(db.Boolean, default=False)
     resolved_at = db.Column(db.DateTime, nullable=True)
 
@@ -119,18 +173,70 @@ def init_db(app):
     with app.app_context():
         db.create_all()
         print("Database initialized successfully")
+    commit_on_teardown(app)
+
+def commit_on_teardown(app):
+    """Commit everything added during a request in one transaction when it ends
+
+    The save_* helpers below only add rows to the session, so a request that
+    creates a user and a prediction costs a single commit. init_db registers it.
+    """
+    @app.teardown_request
+    def commit_session(exc):
+        if exc is not None:
+            db.session.rollback()
+            return
+        try:
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Failed to commit request data: {str(e)}")
 
 def get_user_by_session(session_id):
-    """Get or create user by session ID"""
+    """Get or create user by session ID; a new user is committed by commit_on_teardown"""
     user = User.query.filter_by(session_id=session_id).first()
     if not user:
-        user = User(session_id=session_id)
+        # Assign the id up front so callers can use it before the row is flushed
+        user = User(id=str(uuid.uuid4()), session_id=session_id)
         db.session.add(user)
-        db.session.commit()
     return user
 
+# sha1 -> id of user agents already committed to the database
+_user_agent_ids = {}
+_USER_AGENT_CACHE_SIZE = 1024
+
+def get_user_agent_id(user_agent):
+    """Return the id of the UserAgent row for ``user_agent``, adding one if needed"""
+    digest = hashlib.sha1(user_agent.encode('utf-8')).digest()
+    ua_id = _user_agent_ids.get(digest)
+    if ua_id is not None:
+        return ua_id
+    
+    row = UserAgent.query.filter_by(sha1=digest).first()
+    if row is None:
+        try:
+            with db.session.begin_nested():
+                row = UserAgent(sha1=digest, text=user_agent)
+                db.session.add(row)
+        except IntegrityError:
+            # Inserted concurrently by another worker
+            row = UserAgent.query.filter_by(sha1=digest).one()
+        # Not cached until a later lookup finds it committed, so a rolled
+        # back request can't leave a dangling id in the cache
+        return row.id
+    
+    if len(_user_agent_ids) >= _USER_AGENT_CACHE_SIZE:
+        _user_agent_ids.clear()
+    _user_agent_ids[digest] = row.id
+    return row.id
+
 def save_prediction(user_id, input_data, prediction_result, processing_time, ip_address=None, user_agent=None):
-    """Save prediction to database"""
+    """Save prediction to database; committed at the end of the request by commit_on_teardown"""
+    probabilities = prediction_result['probabilities']
+    low = probabilities.get('Low', 0)
+    moderate = probabilities.get('Moderate', 0)
+    high = probabilities.get('High', 0)
+    
     prediction = Prediction(
         user_id=user_id,
         sentiment_score=input_data['Sentiment_Score'],
@@ -141,23 +247,42 @@ def save_prediction(user_id, input_data, prediction_result, processing_time, ip_
         gender=input_data['Gender'],
         work_study_hours=input_data['Work_Study_Hours'],
         predicted_status=prediction_result['prediction'],
-        confidence_score=max(prediction_result['probabilities'].values()),
-        low_probability=prediction_result['probabilities'].get('Low', 0),
-        moderate_probability=prediction_result['probabilities'].get('Moderate', 0),
-        high_probability=prediction_result['probabilities'].get('High', 0),
+        confidence_score=max(low, moderate, high),
+        low_probability=low,
+        moderate_probability=moderate,
+        high_probability=high,
         processing_time_ms=processing_time * 1000,
         ip_address=ip_address,
-        user_agent=user_agent,
+        user_agent_id=get_user_agent_id(user_agent) if user_agent else None,
         crisis_detected=prediction_result.get('crisis_detected', False),
         crisis_confidence=prediction_result.get('crisis_confidence')
     )
     
     db.session.add(prediction)
-    db.session.commit()
     return prediction
 
+def save_predictions_bulk(items):
+    """Insert many predictions at once from dicts keyed by Prediction column names and commit
+
+    Meant for analytics batch loads outside a request, like bulk_insert_metrics.
+    """
+    if items:
+        db.session.execute(db.insert(Prediction), items)
+        db.session.commit()
+
+def bulk_insert_metrics(rows):
+    """Insert many SystemMetrics rows in one executemany and commit
+
+    Meant for periodic collection and analytics backfills outside a request.
+    Rows are plain dicts keyed by column name and bypass ORM events, so code
+    relying on those should add SystemMetrics objects to the session instead.
+    """
+    if rows:
+        db.session.execute(db.insert(SystemMetrics), rows)
+        db.session.commit()
+
 def save_feedback(user_id, prediction_id, accurate, actual_status=None, feedback_text=None, rating=None):
-    """Save user feedback"""
+    """Save user feedback; committed at the end of the request by commit_on_teardown"""
     feedback = Feedback(
         user_id=user_id,
         prediction_id=prediction_id,
@@ -168,5 +293,4 @@ def save_feedback(user_id, prediction_id, accurate, actual_status=None, feedback
     )
     
     db.session.add(feedback)
-    db.session.commit()
     return feedback
@@ -1,5 +1,6 @@
 import random
 from locust import HttpUser, task, between
+from requests.adapters import HTTPAdapter
 
 class MentalHealthPredictionUser(HttpUser):
     """Locust user class for performance testing"""
@@ -9,6 +10,13 @@ class MentalHealthPredictionUser(HttpUser):
     def on_start(self):
         """Called when a user starts"""
         self.session_id = f"test_session_{random.randint(1000, 9999)}"
+        
+        # Keep connections alive and pooled so the load generator itself
+        # isn't the bottleneck
+        adapter = HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=3)
+        self.client.mount('http://', adapter)
+        self.client.mount('https://', adapter)
+        self.client.headers['Content-Type'] = 'application/json'
     
     @task(3)
     def predict_mental_health(self):
@@ -26,7 +34,6 @@ class MentalHealthPredictionUser(HttpUser):
         with self.client.post(
             "/predict",
             json=data,
-            headers={"Content-Type": "application/json"},
             catch_response=True
         ) as response:
             if response.status_code == 200:
@@ -50,7 +57,6 @@ class MentalHealthPredictionUser(HttpUser):
         with self.client.post(
             "/feedback",
             json=feedback_data,
-            headers={"Content-Type": "application/json"},
             catch_response=True
         ) as response:
             if response.status_code == 200:
@@ -83,7 +89,6 @@ class MentalHealthPredictionUser(HttpUser):
         with self.client.post(
             "/predict",
             json=invalid_data,
-            headers={"Content-Type": "application/json"},
             catch_response=True
         ) as response:
             if response.status_code == 400:
@@ -0,0 +1,95 @@
+"""Pick the subset of the trained ensemble that is worth evaluating at inference.
+
+Run once after (re)training:
+
+    python prune_ensemble.py
+
+Boosted models (XGBoost) keep the shortest prefix of boosting rounds whose
+held-out predictions agree with the full model on at least MIN_AGREEMENT of
+rows without a worse log-loss. Bagged forests use greedy ensemble selection
+(trees picked with replacement to minimize held-out log-loss, weighted by
+how often they were picked), so redundant trees get zero weight and are
+never evaluated.
+
+The result is saved to Config.PRUNED_ENSEMBLE_PATH, which app_enhanced.py
+uses with INFERENCE_BACKEND=joblib. Delete the file to score with the full
+ensemble again.
+"""
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import log_loss
+from sklearn.model_selection import train_test_split
+
+from config import Config
+
+DATASET_PATH = 'mental_health_dataset_improved.csv'
+TARGET_COLUMN = 'Mental_Health_Status'
+MIN_AGREEMENT = 0.99
+MAX_SELECTED_TREES = 50
+
+
+def load_holdout():
+    """Scaled held-out features and encoded labels from the training dataset"""
+    df = pd.read_csv(DATASET_PATH)
+    X = df[Config.FEATURE_COLUMNS].copy()
+    X['Gender'] = joblib.load(Config.LE_GENDER_PATH).transform(X['Gender'])
+    y = joblib.load(Config.LE_TARGET_PATH).transform(df[TARGET_COLUMN])
+    _, X_test, _, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+    return joblib.load(Config.SCALER_PATH).transform(X_test), y_test
+
+
+def prune_boosted(model, X, y):
+    """Shortest prefix of boosting rounds that matches the full model"""
+    full = model.predict_proba(X)
+    full_loss = log_loss(y, full)
+    n_rounds = model.get_booster().num_boosted_rounds()
+    for k in range(1, n_rounds):
+        probs = model.predict_proba(X, iteration_range=(0, k))
+        agreement = (probs.argmax(axis=1) == full.argmax(axis=1)).mean()
+        if agreement >= MIN_AGREEMENT and log_loss(y, probs) <= full_loss:
+            return {'n_iterations': k}, f"{k} of {n_rounds} boosting rounds"
+    return {'n_iterations': n_rounds}, f"all {n_rounds} boosting rounds"
+
+
+def prune_forest(model, X, y):
+    """Greedy ensemble selection over the forest's trees"""
+    tree_probs = [tree.predict_proba(X) for tree in model.estimators_]
+    counts = np.zeros(len(tree_probs))
+    total = np.zeros_like(tree_probs[0])
+    best_loss = np.inf
+    for n in range(1, MAX_SELECTED_TREES + 1):
+        losses = [log_loss(y, (total + p) / n, labels=model.classes_) for p in tree_probs]
+        i = int(np.argmin(losses))
+        if losses[i] >= best_loss:
+            break
+        best_loss = losses[i]
+        counts[i] += 1
+        total += tree_probs[i]
+
+    active_indices = np.flatnonzero(counts)
+    spec = {
+        'active_indices': active_indices.tolist(),
+        'weights': (counts[active_indices] / counts.sum()).tolist()
+    }
+    return spec, f"{len(active_indices)} of {len(tree_probs)} trees"
+
+
+def main():
+    model = joblib.load(Config.MODEL_PATH)
+    X, y = load_holdout()
+    if type(model).__module__.startswith('xgboost'):
+        spec, summary = prune_boosted(model, X, y)
+    else:
+        spec, summary = prune_forest(model, X, y)
+    joblib.dump(spec, Config.PRUNED_ENSEMBLE_PATH)
+
+    from inference import PrunedEnsemble
+    pruned = PrunedEnsemble(model, **spec).predict_proba(X)
+    agreement = (pruned.argmax(axis=1) == model.predict_proba(X).argmax(axis=1)).mean()
+    print(f"Kept {summary} in {Config.PRUNED_ENSEMBLE_PATH} "
+          f"(held-out log-loss {log_loss(y, pruned):.4f}, {agreement:.1%} agreement with the full model)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,128 +1,432 @@
-from flask import request, session, g
-from functools import wraps
+from flask import request, session
+from collections import deque
+from functools import lru_cache, wraps
 import hashlib
 import hmac
+import ipaddress
 import time
+import threading
+import uuid
 import logging
-from datetime import datetime, timedelta
+import os
 import re
+import secrets
+import numpy as np
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from config import Config
+from utils import ojsonify
+
+try:
+    import hyperscan
+except ImportError:  # optional multi-pattern scanner
+    hyperscan = None
+
+try:
+    import redis
+except ImportError:  # optional shared rate-limit store
+    redis = None
+
+SQL_PATTERNS = [
+    r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)",
+    r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
+    r"(\b(OR|AND)\s+['\"]?\w+['\"]?\s*=\s*['\"]?\w+['\"]?)",
+    r"(--|\#|\/\*|\*\/)",
+    r"(\b(SCRIPT|JAVASCRIPT|VBSCRIPT)\b)",
+]
+
+XSS_PATTERNS = [
+    r"<script[^>]*>.*?</script>",
+    r"javascript:",
+    r"on\w+\s*=",
+    r"<iframe[^>]*>",
+    r"<object[^>]*>",
+    r"<embed[^>]*>",
+]
+
+# Characters Hyperscan and Python's re disagree on: anything non-ASCII
+# (Unicode \w, \b and case folding) and the \x1c-\x1f separators, which
+# are \s to Python but not to PCRE
+_RE_ONLY_CHARS = re.compile(r'[^\x00-\x1b\x20-\x7f]')
+
+def _stop_at_first_match(pattern_id, start, end, flags, hits):
+    hits.append(pattern_id)
+    return True
+
+class PatternSet:
+    """A list of case-insensitive patterns scanned in a single pass per value
+
+    Uses a Hyperscan database when the hyperscan package is installed and
+    falls back to one alternation regex otherwise (and for values Hyperscan
+    would match differently).
+    """
+
+    def __init__(self, prefix, patterns):
+        self.prefix = prefix
+        self.regex = re.compile(
+            "|".join(f"(?P<{prefix}{i}>{p})" for i, p in enumerate(patterns)),
+            re.IGNORECASE
+        )
+        self.database = None
+        if hyperscan is not None:
+            self.database = hyperscan.Database()
+            self.database.compile(
+                expressions=[p.encode() for p in patterns],
+                ids=list(range(len(patterns))),
+                elements=len(patterns),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+            )
+            # Scratch space can't be shared between concurrent scans
+            self._local = threading.local()
+
+    def search(self, value):
+        """Return the name of a pattern that matches ``value``, or None"""
+        if self.database is None or _RE_ONLY_CHARS.search(value):
+            match = self.regex.search(value)
+            return match.lastgroup if match else None
+
+        scratch = getattr(self._local, 'scratch', None)
+        if scratch is None:
+            scratch = self._local.scratch = hyperscan.Scratch(self.database)
+        hits = []
+        try:
+            self.database.scan(value.encode(), match_event_handler=_stop_at_first_match, context=hits, scratch=scratch)
+        except hyperscan.ScanTerminated:
+            pass
+        return f"{self.prefix}{hits[0]}" if hits else None
+
+SQL_PATTERN_SET = PatternSet('sql', SQL_PATTERNS)
+XSS_PATTERN_SET = PatternSet('xss', XSS_PATTERNS)
+
+# Characters sanitize_user_input removes from string values
+_STRIP_CHARS = str.maketrans('', '', '<>"\'')
+
+RATE_LIMIT_WINDOW_MS = 60_000
+FAILED_ATTEMPT_WINDOW_MS = 3_600_000
+MAX_FAILED_ATTEMPTS = 10
+# How long an IP stays blocked after exceeding MAX_FAILED_ATTEMPTS
+BLOCK_DURATION_MS = 900_000
+# Failed attempts an IP needs (per the Bloom filter) before they are tracked exactly
+FAILED_ATTEMPT_PROMOTE = 3
+IDLE_GC_INTERVAL_OPS = 10_000
+
+# Sliding-window rate limit over a sorted set of request timestamps: drop
+# entries older than the window, and record this request only if the IP is
+# still under the limit. Returns the count including this request.
+_RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[4])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - window)
+local n = redis.call('ZCARD', KEYS[1])
+if n >= tonumber(ARGV[2]) then
+    return n + 1
+end
+redis.call('ZADD', KEYS[1], now, ARGV[3])
+redis.call('PEXPIRE', KEYS[1], window + 10000)
+return n + 1
+"""
+
+@lru_cache(maxsize=1)
+def _redis_store():
+    """Shared Redis client and rate-limit script, or (None, None) when Redis isn't configured"""
+    if not Config.REDIS_URL:
+        return None, None
+    if redis is None:
+        logging.getLogger('security').warning("REDIS_URL is set but redis is not installed, rate limiting per process")
+        return None, None
+    client = redis.Redis.from_url(Config.REDIS_URL)
+    return client, client.register_script(_RATE_LIMIT_LUA)
+
+def _ip_key(ip_address):
+    """Compact dict key for an IP address: its 4- or 16-byte packed form"""
+    try:
+        return ipaddress.ip_address(ip_address).packed
+    except ValueError:
+        # Not an IP (e.g. a unix socket peer); key on the string itself
+        return ip_address
+
+class _IPWindows:
+    """Timestamps of recent requests (and, once promoted, failed attempts) from one IP address"""
+
+    __slots__ = ('requests', 'failures')
+
+    def __init__(self):
+        self.requests = deque()
+        self.failures = None
+
+class TimeLimitedBloomFilter:
+    """Approximate per-key event counts over a sliding time window in fixed memory
+
+    A ring of counting Bloom filters, one per ``slice_s`` seconds; the oldest
+    slice is cleared as the window moves on. A key's count in a slice is the
+    smallest of its ``hashes`` counters, so counts can be overestimated by
+    collisions but never underestimated. Enough slices are kept to cover the
+    whole window.
+    """
+
+    def __init__(self, window_s, slice_s, size=2 ** 16, hashes=4):
+        self.slice_s = slice_s
+        self.size = size
+        self.hashes = hashes
+        n_slices = -(-window_s // slice_s) + 1
+        # uint8 counters saturate at 255, far above any threshold checked here
+        self.counters = np.zeros((n_slices, size), dtype=np.uint8)
+        self.epochs = np.full(n_slices, -1, dtype=np.int64)
+
+    def _indices(self, key):
+        digest = hashlib.blake2b(key if isinstance(key, bytes) else str(key).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return np.array([(h1 + i * h2) % self.size for i in range(self.hashes)])
+
+    def add(self, key, now):
+        """Count one event for ``key`` at time ``now``"""
+        epoch = int(now // self.slice_s)
+        row = epoch % len(self.epochs)
+        if self.epochs[row] != epoch:
+            self.counters[row] = 0
+            self.epochs[row] = epoch
+        indices = self._indices(key)
+        self.counters[row, indices] = np.minimum(self.counters[row, indices].astype(np.uint16) + 1, 255)
+
+    def slice_counts(self, key, now):
+        """(slice end time, estimated count) for each live slice where ``key`` has events"""
+        epoch = int(now // self.slice_s)
+        live = (self.epochs > epoch - len(self.epochs)) & (self.epochs <= epoch)
+        counts = self.counters[:, self._indices(key)].min(axis=1)
+        return [
+            (float((self.epochs[row] + 1) * self.slice_s), int(counts[row]))
+            for row in np.flatnonzero(live & (counts > 0))
+        ]
+
+    def count(self, key, now):
+        """Estimated number of events for ``key`` in the window ending at ``now``"""
+        return sum(n for _, n in self.slice_counts(key, now))
 
 class SecurityManager:
     """Comprehensive security management for the mental health prediction app"""
     
     def __init__(self):
-        self.failed_attempts = {}  # In production, use Redis or database
-        self.blocked_ips = set()
-        self.rate_limits = {}
+        # Shared across workers when REDIS_URL is set; ip_windows is the
+        # per-process fallback, keyed by the packed address. Redis entries
+        # use wall-clock milliseconds (shared between hosts), local ones
+        # time.monotonic() so clock adjustments can't stretch or skip a window
+        self.redis, self.rate_limit_script = _redis_store()
+        self.ip_windows = {}
+        # First stage of local failed-attempt tracking, in constant memory;
+        # only IPs that reach FAILED_ATTEMPT_PROMOTE get an exact deque
+        self.failure_filter = TimeLimitedBloomFilter(FAILED_ATTEMPT_WINDOW_MS // 1000, 600)
+        # Packed address -> time.monotonic() at which the block lifts
+        self.blocked_ips = {}
+        # Guards the per-process state above against concurrent request threads
+        self._lock = threading.Lock()
+        # Operations since creation; idle IPs are dropped every IDLE_GC_INTERVAL_OPS
+        self._ops = 0
     
     def validate_input_security(self, data):
         """Validate input for security threats"""
         security_logger = logging.getLogger('security')
         
         # Check for SQL injection patterns
-        sql_patterns = [
-            r"(\b(SELECT|INSERT|UPDATE|DELETE|DROP|CREATE|ALTER|EXEC|UNION)\b)",
-            r"(\b(OR|AND)\s+\d+\s*=\s*\d+)",
-            r"(\b(OR|AND)\s+['\"]?\w+['\"]?\s*=\s*['\"]?\w+['\"]?)",
-            r"(--|\#|\/\*|\*\/)",
-            r"(\b(SCRIPT|JAVASCRIPT|VBSCRIPT)\b)",
-        ]
-        
         for field, value in data.items():
             if isinstance(value, str):
-                for pattern in sql_patterns:
-                    if re.search(pattern, value, re.IGNORECASE):
-                        security_logger.warning(f"Potential SQL injection detected in {field}: {value}")
-                        return False, f"Invalid input detected in {field}"
+                matched = SQL_PATTERN_SET.search(value)
+                if matched:
+                    security_logger.warning(f"Potential SQL injection detected in {field} ({matched}): {value}")
+                    return False, f"Invalid input detected in {field}"
         
         # Check for XSS patterns
-        xss_patterns = [
-            r"<script[^>]*>.*?</script>",
-            r"javascript:",
-            r"on\w+\s*=",
-            r"<iframe[^>]*>",
-            r"<object[^>]*>",
-            r"<embed[^>]*>",
-        ]
-        
         for field, value in data.items():
             if isinstance(value, str):
-                for pattern in xss_patterns:
-                    if re.search(pattern, value, re.IGNORECASE):
-                        security_logger.warning(f"Potential XSS detected in {field}: {value}")
-                        return False, f"Invalid input detected in {field}"
+                matched = XSS_PATTERN_SET.search(value)
+                if matched:
+                    security_logger.warning(f"Potential XSS detected in {field} ({matched}): {value}")
+                    return False, f"Invalid input detected in {field}"
         
         return True, "Input validation passed"
     
     def check_rate_limit(self, ip_address):
         """Check if IP address has exceeded rate limits"""
-        current_time = time.time()
-        minute_window = int(current_time // 60)
-        
-        if ip_address not in self.rate_limits:
-            self.rate_limits[ip_address] = {}
-        
-        if minute_window not in self.rate_limits[ip_address]:
-            self.rate_limits[ip_address][minute_window] = 0
-        
-        self.rate_limits[ip_address][minute_window] += 1
-        
-        # Clean old windows
-        for window in list(self.rate_limits[ip_address].keys()):
-            if window < minute_window - 1:
-                del self.rate_limits[ip_address][window]
+        if self.redis is not None:
+            try:
+                current_count = self.rate_limit_script(
+                    keys=[f"rl:{ip_address}"],
+                    args=[int(time.time() * 1000), Config.RATE_LIMIT_PER_MINUTE, uuid.uuid4().hex, RATE_LIMIT_WINDOW_MS]
+                )
+            except redis.RedisError as e:
+                logging.getLogger('security').warning(f"Redis rate limit check failed, using local state: {str(e)}")
+                current_count = self._count_request_locally(ip_address)
+        else:
+            current_count = self._count_request_locally(ip_address)
         
         # Check if limit exceeded
-        current_count = self.rate_limits[ip_address].get(minute_window, 0)
         if current_count > Config.RATE_LIMIT_PER_MINUTE:
             return False, f"Rate limit exceeded: {current_count} requests in current minute"
         
         return True, "Rate limit check passed"
     
+    def _count_request_locally(self, ip_address):
+        """Count this request in the per-process sliding window and return the current count"""
+        with self._lock:
+            current_time = time.monotonic()
+            requests = self._windows_for(ip_address).requests
+        
+            # Drop requests that have left the window
+            cutoff = current_time - RATE_LIMIT_WINDOW_MS / 1000
+            while requests and requests[0] < cutoff:
+                requests.popleft()
+        
+            # Like the Redis script, requests over the limit aren't recorded
+            if len(requests) >= Config.RATE_LIMIT_PER_MINUTE:
+                return len(requests) + 1
+            requests.append(current_time)
+            return len(requests)
+    
     def check_failed_attempts(self, ip_address):
         """Check for suspicious activity from IP address"""
-        current_time = time.time()
-        
-        if ip_address not in self.failed_attempts:
-            self.failed_attempts[ip_address] = []
-        
-        # Clean old attempts (older than 1 hour)
-        self.failed_attempts[ip_address] = [
-            attempt for attempt in self.failed_attempts[ip_address]
-            if current_time - attempt < 3600
-        ]
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.zremrangebyscore(f"fa:{ip_address}", 0, int(time.time() * 1000) - FAILED_ATTEMPT_WINDOW_MS)
+                pipe.zcard(f"fa:{ip_address}")
+                attempts = pipe.execute()[1]
+            except redis.RedisError as e:
+                logging.getLogger('security').warning(f"Redis failed-attempt check failed, using local state: {str(e)}")
+                attempts = self._count_failed_attempts_locally(ip_address)
+        else:
+            attempts = self._count_failed_attempts_locally(ip_address)
         
         # Check if too many failed attempts
-        if len(self.failed_attempts[ip_address]) > 10:
-            self.blocked_ips.add(ip_address)
+        if attempts > MAX_FAILED_ATTEMPTS:
+            self.block_ip(ip_address)
             return False, "IP address blocked due to suspicious activity"
         
         return True, "Failed attempts check passed"
     
+    def block_ip(self, ip_address):
+        """Block IP address for BLOCK_DURATION_MS"""
+        if self.redis is not None:
+            try:
+                self.redis.set(f"bl:{ip_address}", 1, px=BLOCK_DURATION_MS)
+                return
+            except redis.RedisError as e:
+                logging.getLogger('security').warning(f"Redis block failed, using local state: {str(e)}")
+        with self._lock:
+            self.blocked_ips[_ip_key(ip_address)] = time.monotonic() + BLOCK_DURATION_MS / 1000
+    
+    def is_ip_blocked(self, ip_address):
+        """Check whether IP address is currently blocked"""
+        if self.redis is not None:
+            try:
+                if self.redis.exists(f"bl:{ip_address}"):
+                    return True
+            except redis.RedisError as e:
+                logging.getLogger('security').warning(f"Redis block check failed, using local state: {str(e)}")
+        with self._lock:
+            key = _ip_key(ip_address)
+            expires = self.blocked_ips.get(key)
+            if expires is None:
+                return False
+            if expires <= time.monotonic():
+                del self.blocked_ips[key]
+                return False
+            return True
+    
+    def _count_failed_attempts_locally(self, ip_address):
+        """Number of failed attempts from IP address in the last hour, from per-process state"""
+        with self._lock:
+            current_time = time.monotonic()
+            windows = self.ip_windows.get(_ip_key(ip_address))
+            if windows is None or windows.failures is None:
+                # Below the promotion threshold, so never above the block limit
+                return self.failure_filter.count(_ip_key(ip_address), current_time)
+        
+            # Clean old attempts (older than 1 hour)
+            failures = windows.failures
+            cutoff = current_time - FAILED_ATTEMPT_WINDOW_MS / 1000
+            while failures and failures[0] < cutoff:
+                failures.popleft()
+        
+            return len(failures)
+    
     def log_failed_attempt(self, ip_address, reason):
         """Log a failed attempt"""
-        current_time = time.time()
-        
-        if ip_address not in self.failed_attempts:
-            self.failed_attempts[ip_address] = []
-        
-        self.failed_attempts[ip_address].append(current_time)
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.zadd(f"fa:{ip_address}", {uuid.uuid4().hex: int(time.time() * 1000)})
+                pipe.pexpire(f"fa:{ip_address}", FAILED_ATTEMPT_WINDOW_MS + 10000)
+                pipe.execute()
+            except redis.RedisError as e:
+                logging.getLogger('security').warning(f"Redis failed-attempt logging failed, using local state: {str(e)}")
+                self._record_failed_attempt_locally(ip_address)
+        else:
+            self._record_failed_attempt_locally(ip_address)
         
         security_logger = logging.getLogger('security')
         security_logger.warning(f"Failed attempt from {ip_address}: {reason}")
     
+    def _record_failed_attempt_locally(self, ip_address):
+        """Record a failed attempt in per-process state"""
+        with self._lock:
+            current_time = time.monotonic()
+            windows = self._windows_for(ip_address)
+            if windows.failures is not None:
+                windows.failures.append(current_time)
+                return
+        
+            key = _ip_key(ip_address)
+            self.failure_filter.add(key, current_time)
+            slice_counts = self.failure_filter.slice_counts(key, current_time)
+            if sum(n for _, n in slice_counts) >= FAILED_ATTEMPT_PROMOTE:
+                # Seed the exact window from the filter, dating each attempt at
+                # the end of its slice so none expires early. Collisions can
+                # inflate the filter's counts, so seed at most FAILED_ATTEMPT_PROMOTE
+                # attempts; from here on every attempt is counted exactly.
+                seeded = [min(end, current_time) for end, n in sorted(slice_counts) for _ in range(n)]
+                windows.failures = deque(seeded[-FAILED_ATTEMPT_PROMOTE:])
+    
+    def _windows_for(self, ip_address):
+        """Per-process request and failure windows for IP address"""
+        self._ops += 1
+        if self._ops % IDLE_GC_INTERVAL_OPS == 0:
+            self._collect_idle_windows()
+        
+        key = _ip_key(ip_address)
+        windows = self.ip_windows.get(key)
+        if windows is None:
+            windows = self.ip_windows[key] = _IPWindows()
+        return windows
+    
+    def _collect_idle_windows(self):
+        """Forget IP addresses with no request or failure inside the longest window, and expired blocks"""
+        now = time.monotonic()
+        for key in [key for key, expires in self.blocked_ips.items() if expires <= now]:
+            del self.blocked_ips[key]
+        
+        cutoff = now - FAILED_ATTEMPT_WINDOW_MS / 1000
+        idle = [
+            key for key, windows in self.ip_windows.items()
+            if (not windows.requests or windows.requests[-1] < cutoff)
+            and (not windows.failures or windows.failures[-1] < cutoff)
+        ]
+        for key in idle:
+            del self.ip_windows[key]
+    
     def generate_csrf_token(self):
         """Generate CSRF token"""
         if 'csrf_token' not in session:
-            session['csrf_token'] = hashlib.sha256(
-                f"{session.get('session_id', '')}{time.time()}".encode()
-            ).hexdigest()
+            session['csrf_token'] = secrets.token_urlsafe(32)
         return session['csrf_token']
     
     def validate_csrf_token(self, token):
         """Validate CSRF token"""
-        return token == session.get('csrf_token')
+        expected = session.get('csrf_token')
+        if not isinstance(token, str) or expected is None:
+            return False
+        # Constant-time comparison so response timing doesn't leak the token
+        return hmac.compare_digest(token.encode(), expected.encode())
     
     def sanitize_user_input(self, data):
         """Sanitize user input to prevent security issues"""
@@ -131,7 +435,7 @@ class SecurityManager:
         for key, value in data.items():
             if isinstance(value, str):
                 # Remove potentially dangerous characters
-                sanitized[key] = re.sub(r'[<>"\']', '', value).strip()
+                sanitized[key] = value.translate(_STRIP_CHARS).strip()
             else:
                 sanitized[key] = value
         
@@ -144,34 +448,37 @@ class SecurityManager:
         
         for key, value in data.items():
             if key in sensitive_fields and isinstance(value, str):
-                hashed_data[key] = hashlib.sha256(value.encode()).hexdigest()[:8]
+                hashed_data[key] = hashlib.blake2b(value.encode(), digest_size=4).hexdigest()
             else:
                 hashed_data[key] = value
         
         return hashed_data
 
+# One manager per process, so rate limits and failed attempts persist across requests
+_security = SecurityManager()
+
 # Security decorators
 def require_security_check(f):
     """Decorator to require security checks"""
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        security_manager = SecurityManager()
+        security_manager = _security
         ip_address = request.remote_addr
         
         # Check if IP is blocked
-        if ip_address in security_manager.blocked_ips:
-            return jsonify({'error': 'Access denied'}), 403
+        if security_manager.is_ip_blocked(ip_address):
+            return ojsonify({'error': 'Access denied'}), 403
         
         # Check rate limit
         rate_ok, rate_msg = security_manager.check_rate_limit(ip_address)
         if not rate_ok:
             security_manager.log_failed_attempt(ip_address, rate_msg)
-            return jsonify({'error': rate_msg}), 429
+            return ojsonify({'error': rate_msg}), 429
         
         # Check failed attempts
         attempts_ok, attempts_msg = security_manager.check_failed_attempts(ip_address)
         if not attempts_ok:
-            return jsonify({'error': attempts_msg}), 403
+            return ojsonify({'error': attempts_msg}), 403
         
         return f(*args, **kwargs)
     
@@ -183,13 +490,13 @@ def validate_input_security(f):
     def decorated_function(*args, **kwargs):
         if request.is_json:
             data = request.get_json()
-            security_manager = SecurityManager()
+            security_manager = _security
             
             # Validate input security
             security_ok, security_msg = security_manager.validate_input_security(data)
             if not security_ok:
                 security_manager.log_failed_attempt(request.remote_addr, security_msg)
-                return jsonify({'error': 'Invalid input detected'}), 400
+                return ojsonify({'error': 'Invalid input detected'}), 400
             
             # Sanitize input
             sanitized_data = security_manager.sanitize_user_input(data)
@@ -210,9 +517,9 @@ class PrivacyManager:
         
         # Remove or hash identifying information
         if 'ip_address' in anonymized:
-            anonymized['ip_address'] = hashlib.sha256(
-                anonymized['ip_address'].encode()
-            ).hexdigest()[:8]
+            anonymized['ip_address'] = hashlib.blake2b(
+                anonymized['ip_address'].encode(), digest_size=4
+            ).hexdigest()
         
         if 'user_agent' in anonymized:
             anonymized['user_agent'] = anonymized['user_agent'][:50] + "..."
@@ -255,8 +562,19 @@ def add_security_headers(response):
     return response
 
 # Data encryption utilities
+@lru_cache(maxsize=8)
+def _aead_for_key(key):
+    """AES-256-GCM cipher keyed by HKDF over ``key``, built (and key-scheduled) once per key"""
+    derived = HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=b'mental-health-app sensitive data'
+    ).derive(key)
+    return AESGCM(derived)
+
 class DataEncryption:
-    """Simple data encryption for sensitive information"""
+    """Authenticated encryption (AES-GCM) for sensitive information"""
     
     @staticmethod
     def encrypt_sensitive_data(data, key=None):
@@ -264,14 +582,8 @@ class DataEncryption:
         if key is None:
             key = Config.SECRET_KEY.encode()
         
-        # Simple XOR encryption (in production, use proper encryption)
-        encrypted = bytearray()
-        key_bytes = key * (len(data) // len(key) + 1)
-        
-        for i, byte in enumerate(data.encode()):
-            encrypted.append(byte ^ key_bytes[i])
-        
-        return encrypted.hex()
+        nonce = os.urandom(12)
+        return (nonce + _aead_for_key(key).encrypt(nonce, data.encode(), None)).hex()
     
     @staticmethod
     def decrypt_sensitive_data(encrypted_data, key=None):
@@ -280,13 +592,4 @@ class DataEncryption:
             key = Config.SECRET_KEY.encode()
         
         encrypted_bytes = bytes.fromhex(encrypted_data)
-        decrypted = bytearray()
-        key_bytes = key * (len(encrypted_bytes) // len(key) + 1)
-        
-        for i, byte in enumerate(encrypted_bytes):
-            decrypted.append(byte ^ key_bytes[i])
-        
-        return decrypted.decode()
-
-
-
+        return _aead_for_key(key).decrypt(encrypted_bytes[:12], encrypted_bytes[12:], None).decode()
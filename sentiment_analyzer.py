@@ -1,24 +1,137 @@
 import re
+from collections import Counter
+from functools import lru_cache
 import nltk
-from textblob import TextBlob
 import numpy as np
-from datetime import datetime
+import threading
+from textblob import TextBlob
 import logging
 
+# Compiled once for clean_text; whitespace is collapsed with str.split instead
+_URL_RE = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s.,!?]')
+
+# Distinct texts whose cleaned form and sentiment score are kept
+TEXT_CACHE_SIZE = 4096
+
+# Keyword lists for _keyword_based_sentiment
+POSITIVE_WORDS = frozenset({
+    'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
+    'happy', 'joy', 'love', 'like', 'enjoy', 'pleased', 'satisfied',
+    'positive', 'optimistic', 'hopeful', 'confident', 'energetic',
+    'motivated', 'excited', 'grateful', 'thankful', 'blessed'
+})
+
+NEGATIVE_WORDS = frozenset({
+    'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate',
+    'sad', 'depressed', 'angry', 'frustrated', 'annoyed', 'upset',
+    'negative', 'pessimistic', 'hopeless', 'worried', 'anxious',
+    'stressed', 'tired', 'exhausted', 'lonely', 'isolated'
+})
+
+# Behavioral sentiment adjustments by reported level
+ACTIVITY_SCORES = {
+    'low': -0.1,
+    'moderate': 0.0,
+    'high': 0.1
+}
+
+SOCIAL_SCORES = {
+    'low': -0.15,
+    'moderate': 0.0,
+    'high': 0.15
+}
+
+WORK_STRESS_SCORES = {
+    'low': 0.1,
+    'moderate': 0.0,
+    'high': -0.15
+}
+
+# Common mental health survey questions and their scoring
+SURVEY_QUESTION_SCORES = {
+    'mood_today': {
+        'very_poor': 0.0,
+        'poor': 0.25,
+        'fair': 0.5,
+        'good': 0.75,
+        'excellent': 1.0
+    },
+    'energy_level': {
+        'very_low': 0.0,
+        'low': 0.25,
+        'moderate': 0.5,
+        'high': 0.75,
+        'very_high': 1.0
+    },
+    'stress_level': {
+        'very_high': 0.0,
+        'high': 0.25,
+        'moderate': 0.5,
+        'low': 0.75,
+        'very_low': 1.0
+    },
+    'sleep_quality': {
+        'very_poor': 0.0,
+        'poor': 0.25,
+        'fair': 0.5,
+        'good': 0.75,
+        'excellent': 1.0
+    },
+    'social_satisfaction': {
+        'very_dissatisfied': 0.0,
+        'dissatisfied': 0.25,
+        'neutral': 0.5,
+        'satisfied': 0.75,
+        'very_satisfied': 1.0
+    }
+}
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def clean_text(text):
+    """Clean and preprocess text for sentiment analysis"""
+    # Convert to lowercase
+    text = text.lower()
+    
+    # Remove URLs
+    text = _URL_RE.sub('', text)
+    
+    # Remove special characters but keep basic punctuation
+    text = _SPECIAL_CHARS_RE.sub('', text)
+    
+    # Collapse whitespace (including any left around removed characters)
+    return ' '.join(text.split())
+
 class SentimentAnalyzer:
     """Comprehensive sentiment analysis for mental health prediction"""
     
+    # VADER analyzer shared by every instance, loaded on first construction
+    _vader = None
+    _vader_loaded = False
+    _vader_lock = threading.Lock()
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        # Download required NLTK data
-        try:
-            nltk.download('vader_lexicon', quiet=True)
-            nltk.download('punkt', quiet=True)
-            from nltk.sentiment import SentimentIntensityAnalyzer
-            self.vader_analyzer = SentimentIntensityAnalyzer()
-        except:
-            self.vader_analyzer = None
-            self.logger.warning("NLTK VADER not available, using TextBlob only")
+        self.vader_analyzer = type(self)._get_vader()
+        # Sentiment of a string never changes, so repeated texts are scored once
+        self._cached_text_sentiment = lru_cache(maxsize=TEXT_CACHE_SIZE)(self._score_text)
+    
+    @classmethod
+    def _get_vader(cls):
+        """Load the VADER lexicon once per process, downloading it only if it isn't installed"""
+        with cls._vader_lock:
+            if not cls._vader_loaded:
+                cls._vader_loaded = True
+                try:
+                    try:
+                        nltk.data.find('sentiment/vader_lexicon.zip')
+                    except LookupError:
+                        nltk.download('vader_lexicon', quiet=True)
+                    from nltk.sentiment import SentimentIntensityAnalyzer
+                    cls._vader = SentimentIntensityAnalyzer()
+                except Exception:
+                    logging.getLogger(__name__).warning("NLTK VADER not available, using TextBlob only")
+            return cls._vader
     
     def calculate_text_sentiment(self, text):
         """
@@ -33,6 +146,10 @@ class SentimentAnalyzer:
         if not text or not isinstance(text, str):
             return 0.0
         
+        return self._cached_text_sentiment(text)
+    
+    def _score_text(self, text):
+        """Uncached body of calculate_text_sentiment for a non-empty string"""
         # Clean the text
         cleaned_text = self._clean_text(text)
         
@@ -60,14 +177,49 @@ class SentimentAnalyzer:
         keyword_score = self._keyword_based_sentiment(cleaned_text)
         scores.append(keyword_score)
         
-        # Return average of all methods
+        # Return average of all methods (plain arithmetic; np.mean costs
+        # more than the work itself for three values)
         if scores:
-            final_score = np.mean(scores)
+            final_score = sum(scores) / len(scores)
             # Ensure score is between -1 and 1
             return max(-1.0, min(1.0, final_score))
         
         return 0.0
     
+    def calculate_text_sentiment_batch(self, texts):
+        """
+        Calculate sentiment scores for many texts at once
+        
+        Args:
+            texts (list): Input texts to analyze
+            
+        Returns:
+            np.ndarray: One sentiment score between -1 and 1 per text, the
+            same values calculate_text_sentiment returns for each
+        """
+        valid = [i for i, text in enumerate(texts) if text and isinstance(text, str)]
+        cleaned = [self._clean_text(texts[i]) for i in valid]
+        
+        # One row per method (TextBlob, VADER, keywords); NaN where a method
+        # failed or isn't available, so it drops out of that text's average
+        scores = np.full((3, len(cleaned)), np.nan)
+        for j, text in enumerate(cleaned):
+            try:
+                scores[0, j] = TextBlob(text).sentiment.polarity
+            except Exception as e:
+                self.logger.error(f"TextBlob sentiment error: {e}")
+            if self.vader_analyzer:
+                try:
+                    scores[1, j] = self.vader_analyzer.polarity_scores(text)['compound']
+                except Exception as e:
+                    self.logger.error(f"VADER sentiment error: {e}")
+            scores[2, j] = self._keyword_based_sentiment(text)
+        
+        results = np.zeros(len(texts))
+        if cleaned:
+            results[valid] = np.clip(np.nanmean(scores, axis=0), -1.0, 1.0)
+        return results
+    
     def calculate_behavioral_sentiment(self, activities_data):
         """
         Calculate sentiment based on behavioral patterns
@@ -89,30 +241,15 @@ class SentimentAnalyzer:
         
         # Activity level impact
         activity_level = activities_data.get('activity_level', 'moderate')
-        activity_scores = {
-            'low': -0.1,
-            'moderate': 0.0,
-            'high': 0.1
-        }
-        score += activity_scores.get(activity_level, 0.0)
+        score += ACTIVITY_SCORES.get(activity_level, 0.0)
         
         # Social interaction impact
         social_interaction = activities_data.get('social_interaction', 'moderate')
-        social_scores = {
-            'low': -0.15,
-            'moderate': 0.0,
-            'high': 0.15
-        }
-        score += social_scores.get(social_interaction, 0.0)
+        score += SOCIAL_SCORES.get(social_interaction, 0.0)
         
         # Work stress impact
         work_stress = activities_data.get('work_stress', 'moderate')
-        stress_scores = {
-            'low': 0.1,
-            'moderate': 0.0,
-            'high': -0.15
-        }
-        score += stress_scores.get(work_stress, 0.0)
+        score += WORK_STRESS_SCORES.get(work_stress, 0.0)
         
         # Ensure score is between 0 and 1
         return max(0.0, min(1.0, score))
@@ -130,48 +267,9 @@ class SentimentAnalyzer:
         total_score = 0
         question_count = 0
         
-        # Common mental health survey questions and their scoring
-        question_scores = {
-            'mood_today': {
-                'very_poor': 0.0,
-                'poor': 0.25,
-                'fair': 0.5,
-                'good': 0.75,
-                'excellent': 1.0
-            },
-            'energy_level': {
-                'very_low': 0.0,
-                'low': 0.25,
-                'moderate': 0.5,
-                'high': 0.75,
-                'very_high': 1.0
-            },
-            'stress_level': {
-                'very_high': 0.0,
-                'high': 0.25,
-                'moderate': 0.5,
-                'low': 0.75,
-                'very_low': 1.0
-            },
-            'sleep_quality': {
-                'very_poor': 0.0,
-                'poor': 0.25,
-                'fair': 0.5,
-                'good': 0.75,
-                'excellent': 1.0
-            },
-            'social_satisfaction': {
-                'very_dissatisfied': 0.0,
-                'dissatisfied': 0.25,
-                'neutral': 0.5,
-                'satisfied': 0.75,
-                'very_satisfied': 1.0
-            }
-        }
-        
         for question, answer in survey_responses.items():
-            if question in question_scores and answer in question_scores[question]:
-                total_score += question_scores[question][answer]
+            if question in SURVEY_QUESTION_SCORES and answer in SURVEY_QUESTION_SCORES[question]:
+                total_score += SURVEY_QUESTION_SCORES[question][answer]
                 question_count += 1
         
         if question_count > 0:
@@ -184,19 +282,32 @@ class SentimentAnalyzer:
         Calculate combined sentiment score from multiple sources
         
         Args:
-            text_input (str): Text input for sentiment analysis
+            text_input (str or list): Text input for sentiment analysis; a list
+                of texts is scored in one batch and averaged
             activities_data (dict): Behavioral activity data
             survey_responses (dict): Survey response data
             
         Returns:
             float: Combined sentiment score between 0 and 1
         """
+        # A weighted average of one score is that score, so the common
+        # single-source calls skip building the score and weight lists
+        if not activities_data and not survey_responses:
+            if not text_input:
+                return 0.5  # Default neutral score
+            return (self._text_score(text_input) + 1) / 2
+        if not text_input:
+            if not survey_responses:
+                return self.calculate_behavioral_sentiment(activities_data)
+            if not activities_data:
+                return self.calculate_survey_sentiment(survey_responses)
+        
         scores = []
         weights = []
         
         # Text sentiment (weight: 0.4)
         if text_input:
-            text_score = self.calculate_text_sentiment(text_input)
+            text_score = self._text_score(text_input)
             # Convert from -1,1 range to 0,1 range
             text_score_normalized = (text_score + 1) / 2
             scores.append(text_score_normalized)
@@ -222,41 +333,21 @@ class SentimentAnalyzer:
         
         return 0.5  # Default neutral score
     
+    def _text_score(self, text_input):
+        """Text sentiment (-1 to 1) of one text, or the mean over a list of texts"""
+        if isinstance(text_input, (list, tuple)):
+            return float(self.calculate_text_sentiment_batch(text_input).mean())
+        return self.calculate_text_sentiment(text_input)
+    
     def _clean_text(self, text):
         """Clean and preprocess text for sentiment analysis"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,!?]', '', text)
-        
-        return text.strip()
+        return clean_text(text)
     
     def _keyword_based_sentiment(self, text):
         """Simple keyword-based sentiment analysis"""
-        positive_words = [
-            'good', 'great', 'excellent', 'amazing', 'wonderful', 'fantastic',
-            'happy', 'joy', 'love', 'like', 'enjoy', 'pleased', 'satisfied',
-            'positive', 'optimistic', 'hopeful', 'confident', 'energetic',
-            'motivated', 'excited', 'grateful', 'thankful', 'blessed'
-        ]
-        
-        negative_words = [
-            'bad', 'terrible', 'awful', 'horrible', 'disgusting', 'hate',
-            'sad', 'depressed', 'angry', 'frustrated', 'annoyed', 'upset',
-            'negative', 'pessimistic', 'hopeless', 'worried', 'anxious',
-            'stressed', 'tired', 'exhausted', 'lonely', 'isolated'
-        ]
-        
-        words = text.split()
-        positive_count = sum(1 for word in words if word in positive_words)
-        negative_count = sum(1 for word in words if word in negative_words)
+        counts = Counter(text.split())
+        positive_count = sum(counts[word] for word in POSITIVE_WORDS & counts.keys())
+        negative_count = sum(counts[word] for word in NEGATIVE_WORDS & counts.keys())
         
         if positive_count + negative_count == 0:
             return 0.0
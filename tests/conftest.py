@@ -0,0 +1,129 @@
+import os
+from collections import namedtuple
+from functools import lru_cache
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+# Importing the app must not load the model artifacts; tests that need them
+# use the model_artifacts fixture
+os.environ["LOAD_MODELS_ON_STARTUP"] = "0"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-integration", action="store_true", default=False,
+        help="run the integration tests that load the real model artifacts"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-integration"):
+        return
+    skip_integration = pytest.mark.skip(reason="needs --run-integration")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip_integration)
+
+
+ModelArtifacts = namedtuple('ModelArtifacts', ['model', 'scaler', 'le_gender', 'le_target'])
+
+
+@pytest.fixture(scope="session")
+def flask_app(tmp_path_factory):
+    """The Flask app, imported and configured once per test session
+
+    Its log files and feedback.log are written to a temporary directory
+    rather than the repository.
+    """
+    from utils import BackgroundFileWriter
+
+    log_dir = tmp_path_factory.mktemp("app")
+    cwd = os.getcwd()
+    with pytest.MonkeyPatch.context() as mp:
+        # setup_logging opens logs/*.log relative to the working directory on import
+        mp.chdir(log_dir)
+        import app_enhanced
+        mp.chdir(cwd)
+        mp.setattr(app_enhanced, 'feedback_writer', BackgroundFileWriter(str(log_dir / 'feedback.log')))
+
+        app = app_enhanced.app
+        app.config['TESTING'] = True
+        app.config['WTF_CSRF_ENABLED'] = False
+        yield app
+
+
+@pytest.fixture(scope="session")
+def client(flask_app):
+    """Test client shared by all endpoint tests, held open for the session"""
+    with flask_app.test_client() as c:
+        yield c
+
+
+@pytest.fixture(scope="session")
+def _session_model_mocks(flask_app):
+    """MagicMocks installed as the app's model and scaler once for the session"""
+    import app_enhanced
+
+    mocks = SimpleNamespace(model=MagicMock(), scaler=MagicMock())
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(app_enhanced, 'model', mocks.model)
+        mp.setattr(app_enhanced, 'scaler', mocks.scaler)
+        mp.setitem(app_enhanced._GENDER_MAP, 'Female', 0)
+        mp.setitem(app_enhanced._GENDER_MAP, 'Male', 1)
+        yield mocks
+
+
+@pytest.fixture
+def mocked_model(_session_model_mocks):
+    """The session's model and scaler mocks, reset for each test"""
+    for mock in (_session_model_mocks.model, _session_model_mocks.scaler):
+        mock.reset_mock(return_value=True, side_effect=True)
+    return _session_model_mocks
+
+
+@lru_cache(maxsize=256)
+def _cached_validate(frozen):
+    """validate_input_data for a frozen payload; lru_cache doesn't store raises,
+    so only valid payloads are cached and each invalid one gets a fresh error"""
+    from error_handling import validate_input_data
+
+    return validate_input_data(dict(frozen))
+
+
+@pytest.fixture(scope="session")
+def validate():
+    """validate_input_data memoized on the payload's items for the test session"""
+    def _validate(data):
+        return _cached_validate(frozenset(data.items()))
+    return _validate
+
+
+def _load_artifacts(paths, fingerprint):
+    import joblib
+
+    return tuple(joblib.load(path) for path in paths)
+
+
+@lru_cache(maxsize=None)
+def _cached_artifact_loader():
+    """_load_artifacts cached across pytest runs, keyed on the artifact files'
+    size and mtime and memory-mapped back on warm runs. Built on first use so
+    that collecting the tests doesn't import joblib (and with it numpy)."""
+    from joblib import Memory
+
+    return Memory(".pytest_joblib_cache", mmap_mode="r", verbose=0).cache(_load_artifacts)
+
+
+@pytest.fixture(scope="session")
+def model_artifacts():
+    """Trained model and preprocessing objects, loaded once; skips when they aren't available"""
+    from config import Config
+
+    paths = (Config.MODEL_PATH, Config.SCALER_PATH, Config.LE_GENDER_PATH, Config.LE_TARGET_PATH)
+    try:
+        fingerprint = tuple((os.stat(path).st_size, os.stat(path).st_mtime_ns) for path in paths)
+        return ModelArtifacts(*_cached_artifact_loader()(paths, fingerprint))
+    except Exception:
+        pytest.skip("Model artifacts not available in this environment")
@@ -0,0 +1,452 @@
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch, MagicMock
+import orjson
+import pytest
+from hypothesis import given, strategies as st
+from error_handling import ValidationError, CrisisDetectionError
+from config import Config
+
+# A valid /predict payload; tests override individual fields
+VALID_PAYLOAD = {
+    'Sentiment_Score': 0.5,
+    'HRV': 70.0,
+    'Sleep_Hours': 8.0,
+    'Activity': 5000,
+    'Age': 30,
+    'Gender': 'Male',
+    'Work_Study_Hours': 8.0
+}
+# ...and its request body, encoded once
+VALID_PAYLOAD_BYTES = orjson.dumps(VALID_PAYLOAD)
+
+# Override value that removes the field from the payload
+_MISSING = object()
+
+# Valid range of each numeric field, and values just outside it
+_RANGES = {
+    'Sentiment_Score': (0, 1),
+    'HRV': (0, 200),
+    'Sleep_Hours': (0, 24),
+    'Activity': (0, 100000),
+    'Age': (0, 120),
+    'Work_Study_Hours': (0, 24),
+}
+_INTEGER_FIELDS = ('Activity', 'Age')
+
+
+def _out_of_range(field):
+    lo, hi = _RANGES[field]
+    if field in _INTEGER_FIELDS:
+        return st.integers(max_value=lo - 1) | st.integers(min_value=hi + 1)
+    return (
+        st.floats(max_value=lo, exclude_max=True, allow_nan=False)
+        | st.floats(min_value=hi, exclude_min=True, allow_nan=False)
+    )
+
+
+_OUT_OF_RANGE_OVERRIDES = st.sampled_from(sorted(_RANGES)).flatmap(
+    lambda field: st.fixed_dictionaries({field: _out_of_range(field)})
+)
+
+
+@pytest.fixture(scope="session")
+def scaled_sample(model_artifacts):
+    """VALID_PAYLOAD encoded and scaled once for the model tests, read-only so they can share it"""
+    import pandas as pd
+
+    df = pd.DataFrame([VALID_PAYLOAD])
+    df['Gender'] = model_artifacts.le_gender.transform(df['Gender'])
+    scaled = model_artifacts.scaler.transform(df)
+    scaled.setflags(write=False)
+    return scaled
+
+
+class TestMentalHealthApp:
+    """Test cases for the mental health prediction application"""
+    
+    @pytest.mark.parametrize("override, message", [
+        ({}, None),
+        ({'Gender': _MISSING, 'Work_Study_Hours': _MISSING}, "Missing required field"),
+        ({'Gender': 'Other'}, "Gender must be"),
+        # Injection attempts fail type validation before they reach the model
+        ({'Sentiment_Score': "'; DROP TABLE predictions; --"}, "Sentiment_Score must be a number"),
+    ], ids=['valid', 'missing_required_field', 'invalid_gender', 'input_sanitization'])
+    def test_input_validation(self, override, message, validate):
+        """Test validation of valid and invalid input data"""
+        data = {k: v for k, v in {**VALID_PAYLOAD, **override}.items() if v is not _MISSING}
+        if message is None:
+            assert validate(data)
+        else:
+            with pytest.raises(ValidationError, match=message):
+                validate(data)
+    
+    @given(override=_OUT_OF_RANGE_OVERRIDES)
+    def test_out_of_range_values(self, override, validate):
+        """Any value outside a numeric field's range is rejected with that field's range message"""
+        field, = override
+        with pytest.raises(ValidationError, match=f"{field} (must be between|cannot be negative|cannot exceed|seems unusually high)"):
+            validate({**VALID_PAYLOAD, **override})
+    
+    def test_prediction_endpoint_success(self, mocked_model, client):
+        """Test successful prediction endpoint"""
+        import numpy as np
+        # Mock model responses
+        mocked_model.model.predict_proba.return_value = np.array([[0.2, 0.6, 0.2]])  # Low, Moderate, High
+        # Mock preprocessing
+        mocked_model.scaler.transform.return_value = np.zeros((1, len(Config.FEATURE_COLUMNS)))
+        
+        response = client.post('/predict', data=VALID_PAYLOAD_BYTES, content_type='application/json')
+        
+        assert response.status_code == 200
+        # The body is spliced together from pre-encoded fragments, so check all of it
+        data = orjson.loads(response.data)
+        assert list(data) == [
+            'prediction', 'probabilities', 'disclaimer', 'model_accuracy',
+            'chatbot_message', 'processing_time_ms', 'timestamp', 'status'
+        ]
+        assert data['prediction'] == 'Moderate'
+        assert data['probabilities'] == pytest.approx({'Low': 0.2, 'Moderate': 0.6, 'High': 0.2})
+        # Confidence is below 70%
+        assert data['disclaimer'].startswith("This prediction is uncertain")
+        assert data['model_accuracy'] == 'This model has a cross-validation accuracy of 80.8%.'
+        assert data['chatbot_message'].startswith("Your mental health seems moderate")
+        assert isinstance(data['processing_time_ms'], (int, float)) and data['processing_time_ms'] >= 0
+        assert isinstance(data['timestamp'], str)
+        assert data['status'] == 'success'
+        # The label is the argmax of predict_proba; predict itself is never called
+        mocked_model.model.predict.assert_not_called()
+    
+    def test_prediction_endpoint_invalid_data(self, client):
+        """Test prediction endpoint with invalid data"""
+        invalid_data = {**VALID_PAYLOAD, 'Sentiment_Score': 1.5}  # Invalid
+        
+        response = client.post('/predict', data=orjson.dumps(invalid_data), content_type='application/json')
+        
+        assert response.status_code == 400
+        data = response.get_json()
+        assert 'error' in data
+    
+    def test_feedback_endpoint(self, client):
+        """Test feedback endpoint"""
+        feedback_data = {
+            'prediction': 'Moderate',
+            'accurate': True,
+            'actual_status': 'Moderate',
+            'rating': 4
+        }
+        
+        response = client.post('/feedback', data=orjson.dumps(feedback_data), content_type='application/json')
+        
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'message' in data
+    
+    def test_feedback_writer_appends_lines(self):
+        """Queued feedback lines all reach the file"""
+        from utils import BackgroundFileWriter
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'feedback.log')
+            writer = BackgroundFileWriter(path)
+            for i in range(100):
+                writer.write(f"line {i}\n")
+            writer.flush()
+            # The worker may still be writing the batch it already dequeued
+            lines = []
+            for _ in range(100):
+                if os.path.exists(path):
+                    with open(path) as f:
+                        lines = f.readlines()
+                if len(lines) == 100:
+                    break
+                time.sleep(0.01)
+            assert sorted(lines) == sorted(f"line {i}\n" for i in range(100))
+    
+    def test_crisis_detection(self):
+        """Test crisis detection functionality"""
+        from error_handling import check_crisis_conditions
+        
+        # High confidence low mental health prediction
+        prediction = "Low"
+        probabilities = {"Low": 0.85, "Moderate": 0.10, "High": 0.05}
+        
+        with pytest.raises(CrisisDetectionError):
+            check_crisis_conditions(prediction, probabilities)
+    
+    def test_privacy_endpoint(self, client):
+        """Test privacy notice endpoint"""
+        response = client.get('/privacy')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'data_collection' in data
+    
+    def test_health_endpoint(self, client):
+        """Test health check endpoint"""
+        response = client.get('/health')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'healthy'
+
+@pytest.mark.integration
+class TestModelIntegration:
+    """Integration tests for the ML model"""
+    
+    def test_model_loading(self, model_artifacts):
+        """Test that model and preprocessing objects load correctly"""
+        assert model_artifacts.model is not None
+        assert model_artifacts.scaler is not None
+        assert model_artifacts.le_gender is not None
+        assert model_artifacts.le_target is not None
+    
+    def test_model_prediction_format(self, model_artifacts, scaled_sample):
+        """Test that model returns predictions in expected format"""
+        # Make prediction
+        prediction = model_artifacts.model.predict(scaled_sample)
+        probabilities = model_artifacts.model.predict_proba(scaled_sample)
+        
+        # Assertions
+        assert len(prediction) == 1
+        assert prediction[0] in [0, 1, 2]  # Valid class labels
+        assert probabilities.shape == (1, 3)  # 3 classes
+        assert sum(probabilities[0]) == pytest.approx(1.0, abs=1e-5)  # Probabilities sum to 1
+
+class TestSecurityFeatures:
+    """Test security-related features"""
+    
+    def test_rate_limiting(self):
+        """Test rate limiting functionality"""
+        from security_privacy import SecurityManager
+
+        manager = SecurityManager()
+        manager.redis = None
+        with patch.object(Config, 'RATE_LIMIT_PER_MINUTE', 3):
+            results = [manager.check_rate_limit('203.0.113.7')[0] for _ in range(5)]
+            assert results == [True, True, True, False, False]
+            # Other addresses have their own window
+            assert manager.check_rate_limit('2001:db8::7')[0]
+    
+    def test_ip_block_expires(self):
+        """Test that an IP blocked for failed attempts is let back in after BLOCK_DURATION_MS"""
+        from security_privacy import SecurityManager, BLOCK_DURATION_MS, MAX_FAILED_ATTEMPTS
+
+        manager = SecurityManager()
+        manager.redis = None
+        with patch('security_privacy.time.monotonic', return_value=1000.0):
+            for _ in range(MAX_FAILED_ATTEMPTS + 1):
+                manager.log_failed_attempt('203.0.113.7', 'test')
+            assert not manager.check_failed_attempts('203.0.113.7')[0]
+            assert manager.is_ip_blocked('203.0.113.7')
+            assert not manager.is_ip_blocked('203.0.113.8')
+        with patch('security_privacy.time.monotonic', return_value=1000.0 + BLOCK_DURATION_MS / 1000):
+            assert not manager.is_ip_blocked('203.0.113.7')
+            assert not manager.blocked_ips
+    
+    def test_failed_attempt_filter_window(self):
+        """Test that the failed-attempt Bloom filter counts within its window and then forgets"""
+        from security_privacy import TimeLimitedBloomFilter
+
+        bloom = TimeLimitedBloomFilter(window_s=3600, slice_s=600)
+        for _ in range(4):
+            bloom.add(b'\xcb\x00\x71\x07', 1000.0)
+        bloom.add(b'\xcb\x00\x71\x07', 2000.0)
+        assert bloom.count(b'\xcb\x00\x71\x07', 2000.0) == 5
+        assert bloom.count(b'\xcb\x00\x71\x08', 2000.0) == 0
+        # Both slices have left the window 70 minutes later
+        assert bloom.count(b'\xcb\x00\x71\x07', 2000.0 + 4200) == 0
+
+    def test_data_encryption_round_trip(self):
+        """Test that encrypted data decrypts and tampering is detected"""
+        from security_privacy import DataEncryption
+
+        encrypted = DataEncryption.encrypt_sensitive_data('192.168.0.1 – café')
+        assert DataEncryption.decrypt_sensitive_data(encrypted) == '192.168.0.1 – café'
+        # Fresh nonce per call
+        assert encrypted != DataEncryption.encrypt_sensitive_data('192.168.0.1 – café')
+
+        tampered = encrypted[:-2] + ('00' if encrypted[-2:] != '00' else '01')
+        with pytest.raises(Exception):
+            DataEncryption.decrypt_sensitive_data(tampered)
+
+class TestPredictionBatcher:
+    """Test request coalescing and the scoring helpers in inference.py"""
+    
+    def test_concurrent_rows_are_batched(self):
+        """Concurrent callers each get their own row's result"""
+        import threading
+        import time
+        import numpy as np
+        from inference import PredictionBatcher
+        
+        batch_sizes = []
+        
+        def score(rows):
+            batch_sizes.append(len(rows))
+            time.sleep(0.05)
+            return rows * 2
+        
+        batcher = PredictionBatcher(score, max_batch_size=8, max_wait_ms=50)
+        results = {}
+        
+        def submit(i):
+            results[i] = batcher.predict(np.array([float(i), 1.0]))
+        
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        for i in range(6):
+            np.testing.assert_array_equal(results[i], [2.0 * i, 2.0])
+        assert max(batch_sizes) > 1
+    
+    def test_failed_batch_releases_every_caller(self):
+        """A batch whose scoring fails or returns too few rows raises a separate ModelError in each caller"""
+        import threading
+        import time
+        import numpy as np
+        from error_handling import ModelError
+        from inference import PredictionBatcher
+        
+        def score(rows):
+            time.sleep(0.05)
+            return rows[:1] if len(rows) > 1 else rows
+        
+        batcher = PredictionBatcher(score, max_batch_size=8, max_wait_ms=50, timeout_s=5.0)
+        errors = {}
+        
+        def submit(i):
+            try:
+                batcher.predict(np.array([float(i)]))
+            except ModelError as e:
+                errors[i] = e
+        
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+            assert not t.is_alive()
+        
+        assert errors
+        assert len({id(e) for e in errors.values()}) == len(errors)
+        assert all(isinstance(e.__cause__, ValueError) for e in errors.values())
+    
+    def test_batched_caller_times_out(self):
+        """A batched caller gives up after the batching window plus timeout_s"""
+        import threading
+        import numpy as np
+        from error_handling import ModelError
+        from inference import PredictionBatcher
+        
+        release = threading.Event()
+        
+        def score(rows):
+            release.wait(5)
+            return rows
+        
+        batcher = PredictionBatcher(score, max_wait_ms=1, timeout_s=0.1)
+        first = threading.Thread(target=batcher.predict, args=(np.zeros(2),))
+        first.start()
+        try:
+            with pytest.raises(ModelError, match="timed out"):
+                batcher.predict(np.zeros(2))
+        finally:
+            release.set()
+            first.join()
+    
+    def test_single_request_scored_directly(self):
+        """An isolated request is scored on the caller's thread"""
+        import numpy as np
+        from inference import PredictionBatcher
+        
+        batcher = PredictionBatcher(lambda rows: rows + 1)
+        np.testing.assert_array_equal(batcher.predict(np.zeros(3)), np.ones(3))
+        assert batcher._worker is None
+    
+    def test_fused_scaler_matches_standard_scaler(self):
+        """The fused scaling kernel reproduces StandardScaler.transform"""
+        import numpy as np
+        from sklearn.preprocessing import StandardScaler
+        from inference import FusedStandardScaler, fuse_scaler
+        
+        rows = np.random.default_rng(0).normal(loc=5.0, scale=3.0, size=(20, 7))
+        scaler = StandardScaler().fit(rows)
+        fused = fuse_scaler(scaler)
+        
+        assert isinstance(fused, FusedStandardScaler)
+        np.testing.assert_allclose(fused.transform(rows), scaler.transform(rows))
+        # Anything that isn't a fitted StandardScaler is passed through untouched
+        mock_scaler = MagicMock()
+        assert fuse_scaler(mock_scaler) is mock_scaler
+    
+    def test_pruned_forest_scores_only_active_trees(self):
+        """A pruned forest averages just the selected trees by weight"""
+        import numpy as np
+        from inference import PrunedEnsemble
+        
+        trees = [MagicMock() for _ in range(3)]
+        trees[0].predict_proba.return_value = np.array([[1.0, 0.0]])
+        trees[2].predict_proba.return_value = np.array([[0.0, 1.0]])
+        model = MagicMock(estimators_=trees)
+        
+        pruned = PrunedEnsemble(model, active_indices=[0, 2], weights=[0.75, 0.25])
+        np.testing.assert_allclose(pruned.predict_proba(np.zeros((1, 7))), [[0.75, 0.25]])
+        trees[1].predict_proba.assert_not_called()
+
+
+class TestScoringPool:
+    """Test the process pool that scores rows outside the request worker"""
+    
+    @pytest.fixture
+    def model_path(self, tmp_path):
+        import joblib
+        import numpy as np
+        from sklearn.dummy import DummyClassifier
+        
+        path = str(tmp_path / 'model.pkl')
+        joblib.dump(DummyClassifier().fit(np.zeros((4, 2)), [0, 1, 0, 1]), path)
+        return path
+    
+    def test_pool_is_rebuilt_after_a_process_dies(self, model_path):
+        """A killed pool process breaks the pool; the next call restarts it and succeeds"""
+        import signal
+        import numpy as np
+        from inference import ScoringPool
+        
+        pool = ScoringPool(1, model_path, backend='joblib', timeout=30)
+        try:
+            np.testing.assert_allclose(pool.predict_proba(np.zeros((1, 2))), [[0.5, 0.5]])
+            broken = pool._executor
+            for pid in list(broken._processes):
+                os.kill(pid, signal.SIGKILL)
+            np.testing.assert_allclose(pool.predict_proba(np.zeros((1, 2))), [[0.5, 0.5]])
+            assert pool._executor is not broken
+        finally:
+            pool.shutdown()
+    
+    def test_call_times_out_once_ready(self, model_path):
+        """After the first call, a call slower than the timeout raises and leaves the pool usable"""
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        import numpy as np
+        from inference import ScoringPool
+        
+        pool = ScoringPool(1, model_path, backend='joblib', timeout=30)
+        try:
+            # The first call waits for the process to start, whatever the timeout
+            pool.timeout = 1e-6
+            pool.predict_proba(np.zeros((1, 2)))
+            with pytest.raises(FutureTimeoutError):
+                pool.predict_proba(np.zeros((1, 2)))
+            pool.timeout = 30
+            np.testing.assert_allclose(pool.predict_proba(np.zeros((1, 2))), [[0.5, 0.5]])
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    # From the repository root: python -m tests.test_app
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -1,3 +1,11 @@
+import importlib.util
+import os
+
+# Route transfers through the Rust hf_transfer backend (parallel range
+# requests) when it's installed; must be set before huggingface_hub is imported
+if importlib.util.find_spec("hf_transfer") is not None:
+    os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
 from huggingface_hub import HfApi
 
 # Initialize the API (will use the token from CLI authentication)
@@ -6,11 +14,14 @@ api = HfApi()
 # Define your repository ID
 repo_id = "AshutoshAI/mental-health-predictor"
 
-# Upload the entire folder, excluding unnecessary files
-api.upload_folder(
+# Upload the entire folder, excluding unnecessary files. upload_large_folder
+# hashes and uploads files on parallel workers, commits in chunks and resumes
+# an interrupted upload instead of starting over
+api.upload_large_folder(
     folder_path="D:/DSMINIPRO",
     repo_id=repo_id,
     repo_type="model",
     ignore_patterns=["*.csv", "*le_gender.pkl", "*le_target.pkl", "*mental_health_model.pkl", "*scaler.pkl", "*scaler_updated.pkl", "*.log"],
+    num_workers=os.cpu_count(),
 )
-print(f"Successfully uploaded to {repo_id}")
\ No newline at end of file
+print(f"Successfully uploaded to {repo_id}")
@@ -0,0 +1,91 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+import orjson
+from flask import current_app
+
+# (epoch second, ISO string) for the most recently formatted second; swapped
+# as a single tuple so concurrent readers never see a mismatched pair
+_ts_cache = (0, "")
+
+def now_iso():
+    """Current UTC time as an ISO 8601 string, formatted at most once per second"""
+    global _ts_cache
+    t = int(time.time())
+    cached_t, cached_iso = _ts_cache
+    if t != cached_t:
+        cached_iso = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(t))
+        _ts_cache = (t, cached_iso)
+    return cached_iso
+
+def json_response(body, status=200):
+    """Wrap an already-serialized JSON body in a response"""
+    return current_app.response_class(body, status=status, mimetype='application/json')
+
+def ojsonify(obj, status=200):
+    """jsonify replacement that serializes with orjson (numpy-aware, C-implemented)"""
+    return json_response(orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY), status)
+
+class BackgroundFileWriter:
+    """Append lines to a file from a daemon thread instead of the caller
+
+    Lines queued while the writer is busy are written together with a single
+    open/write. If the queue is full the caller writes synchronously rather
+    than dropping the line, and anything still queued is flushed at exit.
+    """
+
+    def __init__(self, path, maxsize=10_000):
+        self.path = path
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._pid = None
+        atexit.register(self.flush)
+
+    def write(self, line):
+        """Queue ``line`` (including its newline) to be appended to the file"""
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            self._append([line])
+
+    def flush(self):
+        """Write out everything currently queued on the calling thread"""
+        batch = self._drain([])
+        if batch:
+            self._append(batch)
+
+    def _ensure_worker(self):
+        # Started on first use so that each forked worker runs its own thread
+        if self._pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid() or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=f'writer-{self.path}', daemon=True
+                )
+                self._worker.start()
+                self._pid = os.getpid()
+
+    def _drain(self, batch):
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _append(self, lines):
+        try:
+            with open(self.path, 'a') as f:
+                f.writelines(lines)
+        except OSError as e:
+            logging.getLogger(__name__).error(f"Failed to write {len(lines)} lines to {self.path}: {str(e)}")
+
+    def _run(self):
+        while True:
+            self._append(self._drain([self._queue.get()]))